@@ -0,0 +1,228 @@
+import os
+import threading
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from feature_pipeline import AGE_BINS
+
+# =========================
+# ROLLUP TABLES
+# =========================
+# Agregados de usage_log.csv que se mantienen en cada escritura, así que el
+# dashboard lee una tabla cuyo tamaño depende de días x segmentos, no de casos.
+
+LOG_FILE = "usage_log.csv"
+RISK_ROLLUP_FILE = "usage_rollup_risk.csv"
+DRIVER_ROLLUP_FILE = "usage_rollup_drivers.csv"
+
+RISK_KEYS = ["date", "dimension", "segment", "risk_level"]
+DRIVER_KEYS = RISK_KEYS + ["driver", "impact_direction"]
+
+RISK_COLUMNS = RISK_KEYS + ["cases", "probability_sum"]
+DRIVER_COLUMNS = DRIVER_KEYS + ["cases"]
+
+# Desgloses demográficos disponibles en el dashboard ("all" = sin desglose)
+DIMENSIONS = ["all", "age_group", "gender", "ethnicity", "income_level"]
+
+RISK_LEVELS = ["Low", "Medium", "High"]
+
+_lock = threading.Lock()
+
+
+# Etiquetas de los grupos (0, 35], (35, 50], (50, 65], (65, 100] de age_group
+AGE_LABELS = ["<=35", "36-50", "51-65", "66+"]
+
+
+def age_bucket(age) -> str:
+    # Mismos cortes que age_group en el modelo (cerrados por la derecha)
+    return AGE_LABELS[int(np.digitize(age, AGE_BINS, right=True))]
+
+
+def case_segments(user_input: dict) -> dict:
+    """Segmento del caso en cada dimensión demográfica."""
+    return {
+        "all": "All",
+        "age_group": age_bucket(user_input["age"]),
+        "gender": str(user_input["gender"]),
+        "ethnicity": str(user_input["ethnicity"]),
+        "income_level": str(user_input["income_level"]),
+    }
+
+
+def _read_rollup(path, columns):
+    if not os.path.exists(path):
+        return pd.DataFrame(columns=columns)
+    return pd.read_csv(path, dtype={"date": str})
+
+
+def _merge_rollup(path, keys, columns, delta):
+    current = _read_rollup(path, columns)
+    merged = (
+        pd.concat([current, delta], ignore_index=True)
+        .groupby(keys, as_index=False)
+        .sum()
+    )
+
+    # Escritura atómica: el dashboard nunca lee un fichero a medias
+    tmp_path = path + ".tmp"
+    merged[columns].to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
+
+def _rollup_deltas(cases):
+    """
+    cases: iterable de (timestamp, user_input, probability, risk_level, drivers)
+    donde drivers es una lista de (driver, impact_direction).
+    """
+    risk_rows = []
+    driver_rows = []
+
+    for timestamp, user_input, probability, risk_level, drivers in cases:
+        date = pd.Timestamp(timestamp).strftime("%Y-%m-%d")
+
+        for dimension, segment in case_segments(user_input).items():
+            key = {
+                "date": date,
+                "dimension": dimension,
+                "segment": segment,
+                "risk_level": risk_level,
+            }
+            risk_rows.append({**key, "cases": 1, "probability_sum": float(probability)})
+
+            for driver, direction in drivers:
+                driver_rows.append({
+                    **key,
+                    "driver": driver,
+                    "impact_direction": direction,
+                    "cases": 1
+                })
+
+    return (
+        pd.DataFrame(risk_rows, columns=RISK_COLUMNS),
+        pd.DataFrame(driver_rows, columns=DRIVER_COLUMNS)
+    )
+
+
+def update_rollups(user_input: dict, result: dict, timestamp=None):
+    """Añade un caso puntuado a las tablas de rollup."""
+    drivers = [
+        (item["driver"], item["impact_direction"])
+        for item in result["action_plan"]
+    ]
+    case = (
+        timestamp or datetime.now(),
+        user_input,
+        result["risk_probability"],
+        result["risk_level"],
+        drivers
+    )
+
+    risk_delta, driver_delta = _rollup_deltas([case])
+
+    with _lock:
+        _merge_rollup(RISK_ROLLUP_FILE, RISK_KEYS, RISK_COLUMNS, risk_delta)
+        _merge_rollup(DRIVER_ROLLUP_FILE, DRIVER_KEYS, DRIVER_COLUMNS, driver_delta)
+
+
+def rebuild_rollups(log_file: str = LOG_FILE):
+    """
+    Recalcula desde cero las dos tablas de rollup a partir del log de uso.
+
+    Solo hace falta una vez para logs escritos antes de que existieran los
+    rollups, o para repararlos. Los drivers se recuperan de los mensajes
+    key_driver_N del log.
+    """
+    # Importado aquí para no cargar el modelo solo por leer los rollups
+    from model_utils import driver_message_lookup
+
+    lookup = driver_message_lookup()
+    df_log = pd.read_csv(log_file)
+    driver_cols = [c for c in df_log.columns if c.startswith("key_driver_") and c[11:].isdigit()]
+
+    cases = []
+    for row in df_log.to_dict("records"):
+        drivers = [
+            lookup[row[c]] for c in driver_cols
+            if isinstance(row[c], str) and row[c] in lookup
+        ]
+        cases.append((
+            row["timestamp"], row, row["risk_probability"], row["risk_level"], drivers
+        ))
+
+    risk_delta, driver_delta = _rollup_deltas(cases)
+
+    with _lock:
+        for path in (RISK_ROLLUP_FILE, DRIVER_ROLLUP_FILE):
+            if os.path.exists(path):
+                os.remove(path)
+        _merge_rollup(RISK_ROLLUP_FILE, RISK_KEYS, RISK_COLUMNS, risk_delta)
+        _merge_rollup(DRIVER_ROLLUP_FILE, DRIVER_KEYS, DRIVER_COLUMNS, driver_delta)
+
+# =========================
+# QUERY API
+# =========================
+
+def _select(df, dimension, start, end):
+    if dimension not in DIMENSIONS:
+        raise ValueError(f"Unknown dimension '{dimension}'. Use one of {DIMENSIONS}.")
+
+    mask = df["dimension"] == dimension
+    if start is not None:
+        mask &= df["date"] >= pd.Timestamp(start).strftime("%Y-%m-%d")
+    if end is not None:
+        mask &= df["date"] <= pd.Timestamp(end).strftime("%Y-%m-%d")
+
+    return df[mask]
+
+
+def risk_distribution(dimension="all", start=None, end=None, by_day=False) -> pd.DataFrame:
+    """
+    Casos, proporción de casos y probabilidad media por nivel de riesgo,
+    para cada segmento de `dimension` (y cada día si by_day=True).
+    """
+    df = _select(_read_rollup(RISK_ROLLUP_FILE, RISK_COLUMNS), dimension, start, end)
+
+    group = (["date"] if by_day else []) + ["segment"]
+    out = df.groupby(group + ["risk_level"], as_index=False)[["cases", "probability_sum"]].sum()
+
+    out["share"] = out["cases"] / out.groupby(group)["cases"].transform("sum")
+    out["mean_probability"] = out["probability_sum"] / out["cases"]
+
+    return out.drop(columns="probability_sum")
+
+
+def mean_probability(dimension="all", start=None, end=None, by_day=True) -> pd.DataFrame:
+    """Número de casos y probabilidad media de riesgo por segmento (y día)."""
+    df = _select(_read_rollup(RISK_ROLLUP_FILE, RISK_COLUMNS), dimension, start, end)
+
+    group = (["date"] if by_day else []) + ["segment"]
+    out = df.groupby(group, as_index=False)[["cases", "probability_sum"]].sum()
+    out["mean_probability"] = out["probability_sum"] / out["cases"]
+
+    return out.drop(columns="probability_sum")
+
+
+def driver_frequency(dimension="all", start=None, end=None, risk_level=None,
+                     by_day=False) -> pd.DataFrame:
+    """
+    Con qué frecuencia aparece cada driver entre los principales de un caso,
+    por segmento, separando si subía o bajaba el riesgo. `frequency` es
+    relativa al número de casos del segmento.
+    """
+    drivers = _select(_read_rollup(DRIVER_ROLLUP_FILE, DRIVER_COLUMNS), dimension, start, end)
+    cases = _select(_read_rollup(RISK_ROLLUP_FILE, RISK_COLUMNS), dimension, start, end)
+
+    if risk_level is not None:
+        drivers = drivers[drivers["risk_level"] == risk_level]
+        cases = cases[cases["risk_level"] == risk_level]
+
+    group = (["date"] if by_day else []) + ["segment"]
+    out = drivers.groupby(group + ["driver", "impact_direction"], as_index=False)["cases"].sum()
+    totals = cases.groupby(group, as_index=False)["cases"].sum().rename(columns={"cases": "segment_cases"})
+
+    out = out.merge(totals, on=group, how="left")
+    out["frequency"] = out["cases"] / out["segment_cases"]
+
+    return out.sort_values(group + ["cases"], ascending=[True] * len(group) + [False])
@@ -1,8 +1,11 @@
 import streamlit as st
 import pandas as pd
 import os
-from model_utils import predict_risk_with_explanation_and_action
+from model_utils import predict_risk_two_phase, registry, MODELS_DIR, LiveScoringSession
+from analytics import update_rollups
 import uuid
+import threading
+import time
 from datetime import datetime
 from PIL import Image
 
@@ -11,6 +14,34 @@ from PIL import Image
 # USE CASES
 #===============
 
+LOG_FILE = "usage_log.csv"
+
+# Las sesiones de Streamlit corren en hilos distintos
+_log_lock = threading.Lock()
+
+def append_to_log(df_log, path=LOG_FILE):
+    """
+    Añade filas al log. Si las columnas no coinciden con la cabecera del
+    fichero (p. ej. logs anteriores a model_version), se reescribe el log
+    entero con la unión de columnas en vez de escribir filas desalineadas.
+    """
+    if not os.path.exists(path):
+        df_log.to_csv(path, index=False)
+        return
+
+    header = pd.read_csv(path, nrows=0).columns.tolist()
+
+    if set(df_log.columns) <= set(header):
+        df_log.reindex(columns=header).to_csv(path, mode="a", header=False, index=False)
+        return
+
+    # Migración: las filas antiguas quedan vacías en las columnas nuevas
+    df_all = pd.concat([pd.read_csv(path), df_log], ignore_index=True)
+
+    tmp_path = path + ".tmp"
+    df_all.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+
 def log_case(user_input, result):
 
     log_entry = {
@@ -23,6 +54,7 @@ def log_case(user_input, result):
         # Output
         "risk_probability": result["risk_probability"],
         "risk_level": result["risk_level"],
+        "model_version": result["model_version"],
     }
 
     #Key drivers
@@ -32,12 +64,11 @@ def log_case(user_input, result):
 
     df_log = pd.DataFrame([log_entry])
 
-    df_log.to_csv(
-        "usage_log.csv",
-        mode="a",
-        header=not os.path.exists("usage_log.csv"),
-        index=False
-    )
+    with _log_lock:
+        append_to_log(df_log)
+
+    # Rollups de la página de analítica, actualizados con cada caso
+    update_rollups(user_input, result, timestamp=log_entry["timestamp"])
 
 #===============
 # VALIDATION
@@ -61,8 +92,10 @@ def validate_inputs(user_input):
         st.error("Weight must be greater than zero.")
         st.stop()
 
-    # GLUCOSE
-    if user_input["glucose_fasting"] < 50 or user_input["glucose_fasting"] > 300:
+    # GLUCOSE (opcional si hay modelo sin glucosa)
+    if user_input["glucose_fasting"] is not None and (
+        user_input["glucose_fasting"] < 50 or user_input["glucose_fasting"] > 300
+    ):
         errors.append("Fasting glucose value seems unusual. Please confirm.")
 
     # PHYSICAL ACTIVITY
@@ -75,6 +108,155 @@ def validate_inputs(user_input):
 
     return errors, warnings
 
+#===============
+# RESULT CARDS
+#===============
+
+def render_risk_card(result):
+    risk_pct = int(result["risk_probability"] * 100)
+
+    # ---------- CARD 1: RISK ----------
+
+    st.markdown("<h2>Your diabetes risk</h2>", unsafe_allow_html=True)
+
+    st.markdown(
+        f"<div style='font-size:46px; font-weight:700; color:#1F4F4A;'>"
+        f"{risk_pct}%</div>",
+        unsafe_allow_html=True
+    )
+
+    st.markdown(
+        "<p style='color:#6B8F8B; margin-bottom:1.5rem;'>Estimated probability</p>",
+        unsafe_allow_html=True
+    )
+
+    st.progress(risk_pct)
+    st.caption(
+        "0% = very low risk · 100% = very high risk"
+    )
+
+
+    if result["risk_level"] == "Low":
+        badge_color = "#DFF5EC"
+        text_color = "#1F7A63"
+        label = "Low risk"
+    elif result["risk_level"] == "Medium":
+        badge_color = "#FFF4D6"
+        text_color = "#8A6A00"
+        label = "Moderate risk"
+    else:
+        badge_color = "#FDE2E2"
+        text_color = "#9B1C1C"
+        label = "High risk"
+
+    st.markdown(
+        f"""
+        <div style="
+            display:inline-block;
+            padding:0.5rem 1.2rem;
+            border-radius:999px;
+            background-color:{badge_color};
+            color:{text_color};
+            font-weight:600;
+            font-size:14px;
+            margin-top:1.2rem;
+        ">
+            {label}
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
+
+
+def render_explanation(result):
+    # ---------- CARD 2: DRIVERS ----------
+    st.markdown("<h3>What influences your risk</h3>", unsafe_allow_html=True)
+
+    st.markdown(
+    """
+    ---
+    <div style='text-align:center; font-size:16px; color:#2e7d65; margin-top:15px;'>
+    Understand what is impacting your result the most:
+    </div>
+    """,
+    unsafe_allow_html=True
+)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    for d in result["key_drivers"]:
+        st.markdown(f"<p>• {d}</p>", unsafe_allow_html=True)
+
+    # ---------- CARD 3: ACTION PLAN ----------
+
+    st.markdown("<h3>What you can do now</h3>", unsafe_allow_html=True)
+
+    st.markdown(
+    """
+    ---
+    <div style='text-align:center; font-size:16px; color:#2e7d65; margin-top:15px;'>
+    Small changes, done consistently, have the biggest long-term impact.
+    
+    </div>
+    """,
+    unsafe_allow_html=True
+)
+    
+    st.markdown("<br>", unsafe_allow_html=True)
+
+    for item in result["action_plan"]:
+        st.markdown(
+            f"<p style='font-weight:600; margin-top:1.2rem;'>"
+            f"{item['driver']}</p>",
+            unsafe_allow_html=True
+        )
+        for rec in item["recommendations"]:
+            st.markdown(
+                f"<p style='margin-left:1rem;'>– {rec}</p>",
+                unsafe_allow_html=True
+            )
+
+#===============
+# LIVE MODE
+#===============
+
+def render_live_preview(user_input):
+    errors, _ = validate_inputs(user_input)
+
+    if errors:
+        for e in errors:
+            st.error(e)
+        return
+
+    if "live_scoring" not in st.session_state:
+        st.session_state["live_scoring"] = LiveScoringSession()
+    session = st.session_state["live_scoring"]
+
+    # La probabilidad va por el camino rápido y se pinta al momento
+    render_risk_card(session.score(user_input))
+
+    explanation = st.empty()
+    result, stale = session.explain(user_input)
+
+    if stale:
+        if result is not None:
+            with explanation.container():
+                st.caption("Updating explanation...")
+                render_explanation(result)
+
+        # Debounce: si el usuario mueve otro widget durante la espera,
+        # Streamlit empieza otra ejecución sin esperar a que esta acabe.
+        # Sin force, esta ejecución ya abandonada no calcula SHAP para
+        # unos valores intermedios: explain los devuelve como stale
+        time.sleep(session.time_to_settle())
+        result, stale = session.explain(user_input)
+
+        if stale:
+            return
+
+    with explanation.container():
+        render_explanation(result)
+
 # =========================
 # PAGE CONFIG
 # =========================
@@ -85,9 +267,21 @@ st.set_page_config(
 )
 
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+#===============
+# MODEL HOT-SWAP
+#===============
+
+@st.cache_resource
+def start_model_watcher():
+    # Una sola vez por proceso: los bundles nuevos en MODELS_DIR se cargan en segundo plano
+    return registry.watch(MODELS_DIR)
+
+start_model_watcher()
 BANNER_PATH = os.path.join(BASE_DIR, "banner.jpg")
 
-st.image(BANNER_PATH, use_container_width=True)
+if os.path.exists(BANNER_PATH):
+    st.image(BANNER_PATH, use_container_width=True)
 
 #st.image("banner.jpg", 
          #use_container_width=True
@@ -187,7 +381,16 @@ st.warning(
 # =========================
 
 
-with st.form("health_form"):
+live_mode = st.toggle(
+    "Live mode",
+    help="See your risk update instantly as you change any value."
+)
+
+# Un formulario solo envía al pulsar el botón: en modo live cada widget
+# tiene que relanzar el script
+health_form = st.container() if live_mode else st.form("health_form")
+
+with health_form:
     st.info(
     "Please enter values as accurately as possible. "
     "If you are unsure about a value, provide your best estimate. "
@@ -341,6 +544,14 @@ with st.form("health_form"):
         step=1.0
     )
 
+    # Solo si hay un modelo sin glucosa cargado se puede dejar en blanco
+    glucose_optional = registry.current().glucose_free is not None
+
+    glucose_unknown = glucose_optional and st.checkbox(
+        "I don't know my fasting glucose",
+        help="Your risk will be estimated with a model that does not use blood glucose."
+    )
+
     glucose_fasting = st.number_input(
         "Fasting glucose (mg/dL)",
         value=95.0,
@@ -354,36 +565,47 @@ with st.form("health_form"):
         """
     )
 
-    submitted = st.form_submit_button("Assess my risk")
+    if glucose_unknown:
+        glucose_fasting = None
+
+    if live_mode:
+        submitted = st.button("Assess my risk")
+    else:
+        submitted = st.form_submit_button("Assess my risk")
     
 st.markdown("</div>", unsafe_allow_html=True)
 
 # =========================
 # RESULTS
 # =========================
-if submitted:
-    user_input = {
-        "age": age,
-        "gender": gender,
-        "ethnicity": ethnicity,
-        "income_level": income_level,
-        "education_level": education_level,
-        "employment_status": employment_status,
-        "smoking_status": smoking_status,
-        "family_history_diabetes": family_history_diabetes,
-        "hypertension_history": hypertension_history,
-        "cardiovascular_history": cardiovascular_history,
-        "heart_rate": heart_rate,
-        "alcohol_consumption_per_week": alcohol_consumption_per_week,
-        "diet_score": diet_score,
-        "sleep_hours_per_day": sleep_hours_per_day,
-        "bmi": bmi,
-        "screen_time_hours_per_day": screen_time_hours_per_day,
-        "physical_activity_minutes_per_week": physical_activity_minutes_per_week,
-        "ldl_cholesterol": ldl_cholesterol,
-        "glucose_fasting": glucose_fasting
-    }
+user_input = {
+    "age": age,
+    "gender": gender,
+    "ethnicity": ethnicity,
+    "income_level": income_level,
+    "education_level": education_level,
+    "employment_status": employment_status,
+    "smoking_status": smoking_status,
+    "family_history_diabetes": family_history_diabetes,
+    "hypertension_history": hypertension_history,
+    "cardiovascular_history": cardiovascular_history,
+    "heart_rate": heart_rate,
+    "alcohol_consumption_per_week": alcohol_consumption_per_week,
+    "diet_score": diet_score,
+    "sleep_hours_per_day": sleep_hours_per_day,
+    "bmi": bmi,
+    "screen_time_hours_per_day": screen_time_hours_per_day,
+    "physical_activity_minutes_per_week": physical_activity_minutes_per_week,
+    "ldl_cholesterol": ldl_cholesterol,
+    "glucose_fasting": glucose_fasting
+}
+
+if live_mode and not submitted:
+    with st.sidebar:
+        st.markdown("<h3>Live risk preview</h3>", unsafe_allow_html=True)
+        render_live_preview(user_input)
 
+if submitted:
     errors, warnings = validate_inputs(user_input)
 
     if errors:
@@ -395,111 +617,16 @@ if submitted:
         for w in warnings:
             st.warning(w)
 
-    with st.spinner("Analysing your health profile..."):
-        result = predict_risk_with_explanation_and_action(user_input)
-        risk_pct = int(result["risk_probability"] * 100)
-        
-
-    # ---------- CARD 1: RISK ----------
-
-    st.markdown("<h2>Your diabetes risk</h2>", unsafe_allow_html=True)
-
-    st.markdown(
-        f"<div style='font-size:46px; font-weight:700; color:#1F4F4A;'>"
-        f"{risk_pct}%</div>",
-        unsafe_allow_html=True
-    )
-
-    st.markdown(
-        "<p style='color:#6B8F8B; margin-bottom:1.5rem;'>Estimated probability</p>",
-        unsafe_allow_html=True
-    )
-
-    st.progress(risk_pct)
-    st.caption(
-        "0% = very low risk · 100% = very high risk"
-    )
-
-
-    if result["risk_level"] == "Low":
-        badge_color = "#DFF5EC"
-        text_color = "#1F7A63"
-        label = "Low risk"
-    elif result["risk_level"] == "Medium":
-        badge_color = "#FFF4D6"
-        text_color = "#8A6A00"
-        label = "Moderate risk"
-    else:
-        badge_color = "#FDE2E2"
-        text_color = "#9B1C1C"
-        label = "High risk"
-
-    st.markdown(
-        f"""
-        <div style="
-            display:inline-block;
-            padding:0.5rem 1.2rem;
-            border-radius:999px;
-            background-color:{badge_color};
-            color:{text_color};
-            font-weight:600;
-            font-size:14px;
-            margin-top:1.2rem;
-        ">
-            {label}
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
-
+    # El riesgo se pinta en cuanto está; la explicación llega después
+    risk, explanation_future = predict_risk_two_phase(user_input)
 
-    # ---------- CARD 2: DRIVERS ----------
-    st.markdown("<h3>What influences your risk</h3>", unsafe_allow_html=True)
+    render_risk_card(risk)
 
-    st.markdown(
-    """
-    ---
-    <div style='text-align:center; font-size:16px; color:#2e7d65; margin-top:15px;'>
-    Understand what is impacting your result the most:
-    </div>
-    """,
-    unsafe_allow_html=True
-)
-    
-    st.markdown("<br>", unsafe_allow_html=True)
+    with st.spinner("Working out what drives your risk..."):
+        result = explanation_future.result()
 
-    for d in result["key_drivers"]:
-        st.markdown(f"<p>• {d}</p>", unsafe_allow_html=True)
+    render_explanation(result)
 
-    # ---------- CARD 3: ACTION PLAN ----------
-
-    st.markdown("<h3>What you can do now</h3>", unsafe_allow_html=True)
-
-    st.markdown(
-    """
-    ---
-    <div style='text-align:center; font-size:16px; color:#2e7d65; margin-top:15px;'>
-    Small changes, done consistently, have the biggest long-term impact.
-    
-    </div>
-    """,
-    unsafe_allow_html=True
-)
-    
-    st.markdown("<br>", unsafe_allow_html=True)
-
-    for item in result["action_plan"]:
-        st.markdown(
-            f"<p style='font-weight:600; margin-top:1.2rem;'>"
-            f"{item['driver']}</p>",
-            unsafe_allow_html=True
-        )
-        for rec in item["recommendations"]:
-            st.markdown(
-                f"<p style='margin-left:1rem;'>– {rec}</p>",
-                unsafe_allow_html=True
-            )
-    
     with st.expander("How this risk is calculated"):
         st.markdown(
             """
@@ -523,8 +650,6 @@ if submitted:
 
     log_case(user_input, result)
 
-    LOG_FILE = "usage_log.csv"
-
     st.subheader("Stored cases (traceability log)")
 
 
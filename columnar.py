@@ -0,0 +1,233 @@
+"""
+Puntuación por lotes en formato columnar.
+
+Punto de entrada para sistemas que ya tienen los perfiles en columnas:
+record batches o tablas Arrow (p. ej. leídas de Parquet), o un dict de
+arrays numpy con los nombres de campo del formulario. Las features se
+construyen directamente sobre esos buffers y los resultados se devuelven en
+columnas, así que nunca se crea un dict, una fila de DataFrame ni un dict de
+resultado por fila.
+
+    import pyarrow.parquet as pq
+    from columnar import predict_risk_columnar
+
+    for batch in pq.ParquetFile("profiles.parquet").iter_batches():
+        results = predict_risk_columnar(batch)
+
+Columnas del resultado, una fila por fila de entrada:
+  risk_probability                 float
+  risk_level                       Low / Medium / High
+  model_version                    versión del modelo que puntuó la fila
+  explanation_method               exact, o el método aproximado usado
+  driver_1..driver_N, impact_1..impact_N
+                                   drivers principales por impacto absoluto (log-odds)
+
+Aquí no se generan los mensajes ni los planes de acción: son por naturaleza
+objetos Python por fila; los nombres de driver se traducen con
+driver_to_user_message o ACTIONABLE_RECOMMENDATIONS donde hagan falta.
+"""
+
+import numpy as np
+import pandas as pd
+
+from feature_pipeline import build_features, check_features
+from model_utils import (
+    FEATURE_TO_DRIVER,
+    approx_margin,
+    driver_membership,
+    model_probabilities,
+    registry,
+    route_model,
+    shap_matrix,
+)
+
+# pyarrow solo hace falta para entrada/salida Arrow
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:
+    pa = None
+
+TOP_DRIVERS = 5
+
+RISK_LEVELS = ["Low", "Medium", "High"]
+RISK_THRESHOLDS = [0.30, 0.60]
+
+ALL_DRIVERS = sorted(set(FEATURE_TO_DRIVER.values()))
+
+# =========================
+# INPUT
+# =========================
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Arrow input/output needs pyarrow: pip install pyarrow")
+
+
+def arrow_columns(data, bundle) -> dict:
+    """
+    RecordBatch o Table -> dict columna -> np.ndarray.
+
+    Las columnas numéricas sin nulos se ven sin copiar. Las categóricas se
+    codifican en Arrow (dictionary_encode) y solo se busca en la tabla del
+    bundle cada valor distinto, así que nunca se crea un str por fila.
+    """
+    _require_pyarrow()
+
+    pl = {}
+    for name in data.schema.names:
+        column = data.column(name)
+        if isinstance(column, pa.ChunkedArray):
+            # Copia solo si la tabla tiene varios trozos
+            column = column.combine_chunks()
+
+        if name not in bundle.encodings:
+            pl[name] = column.to_numpy(zero_copy_only=False)
+            continue
+
+        if not pa.types.is_dictionary(column.type):
+            column = pc.dictionary_encode(column)
+
+        codes = bundle.encodings[name]
+        unknown = codes["Unknown"]
+
+        # Una entrada por valor distinto, más una al final para los nulos
+        lookup = np.array(
+            [codes.get(str(v), unknown) for v in column.dictionary.to_pylist()] + [unknown],
+            dtype=int
+        )
+        indices = column.indices.fill_null(len(lookup) - 1).to_numpy()
+        pl[name + "_encoded"] = lookup[indices]
+
+    return pl
+
+
+def input_columns(data, bundle) -> dict:
+    """Arrow o dict de arrays -> dict columna -> np.ndarray, con glucosa a NaN si falta."""
+    if isinstance(data, dict):
+        pl = {col: np.asarray(values) for col, values in data.items()}
+    else:
+        pl = arrow_columns(data, bundle)
+
+    n_rows = len(next(iter(pl.values()))) if pl else 0
+    pl.setdefault("glucose_fasting", np.full(n_rows, np.nan))
+
+    return pl
+
+
+def feature_matrix(pl: dict, bundle, rows) -> pd.DataFrame:
+    """
+    Features de `bundle` para las filas `rows`, escritas directamente en una
+    única matriz float: es la que recibe LightGBM, sin más copias.
+    """
+    check_features(pl, bundle.features)
+
+    X = np.empty((len(pl["glucose_fasting"][rows]), len(bundle.features)))
+    for j, f in enumerate(bundle.features):
+        X[:, j] = pl[f][rows]
+
+    return pd.DataFrame(X, columns=list(bundle.features), copy=False)
+
+# =========================
+# SCORING
+# =========================
+
+def top_drivers(features, impacts, top_n):
+    """
+    (índices en ALL_DRIVERS, impactos) de los top_n drivers de cada fila,
+    ordenados por impacto absoluto como aggregate_shap_by_driver.
+    """
+    drivers, membership = driver_membership(features)
+    driver_impacts = np.asarray(impacts) @ membership
+
+    order = np.argsort(-np.abs(driver_impacts), axis=1, kind="stable")[:, :top_n]
+    global_index = np.array([ALL_DRIVERS.index(d) for d in drivers])
+
+    return global_index[order], np.take_along_axis(driver_impacts, order, axis=1)
+
+
+def too_close(top_impacts, margin):
+    """drivers_too_close para todas las filas a la vez."""
+    impacts = np.abs(top_impacts)
+    gaps = impacts[:, :-1] - impacts[:, 1:]
+    return (gaps < 2 * margin).any(axis=1) | (impacts[:, :-1] < margin).any(axis=1)
+
+
+def score_columns(data, bundle=None, explanation="exact", tree_limit=None,
+                  fallback_margin=None, top_n=TOP_DRIVERS) -> dict:
+    """
+    Puntúa y explica un lote en formato columnar.
+
+    data: Arrow RecordBatch/Table o dict columna -> np.ndarray
+    devuelve: dict columna de resultado -> np.ndarray / pd.Categorical
+    """
+    bundle = bundle or registry.current()
+
+    pl = build_features(input_columns(data, bundle), bundle.encodings)
+    n_rows = len(pl["glucose_fasting"])
+    with_glucose = ~np.isnan(pl["glucose_fasting"])
+
+    probability = np.empty(n_rows)
+    version = np.zeros(n_rows, dtype=int)
+    method = np.zeros(n_rows, dtype=int)
+    driver = np.zeros((n_rows, top_n), dtype=int)
+    impact = np.zeros((n_rows, top_n))
+
+    versions = []
+    methods = ["exact"] if explanation == "exact" else ["exact", explanation]
+
+    for mask in (with_glucose, ~with_glucose):
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            continue
+
+        # Sin glucosa: route_model da el modelo sin glucosa o el error de siempre
+        group_bundle = bundle if mask is with_glucose else route_model({}, bundle)
+        rows = slice(None) if len(rows) == n_rows else rows
+        X = feature_matrix(pl, group_bundle, rows)
+
+        probability[rows] = model_probabilities(X, group_bundle)
+
+        impacts = shap_matrix(X, group_bundle, explanation, tree_limit)
+        # Uno más para poder medir el hueco tras el último driver mostrado
+        group_driver, group_impact = top_drivers(X.columns, impacts, top_n + 1)
+        group_method = np.full(len(X), methods.index(explanation))
+
+        if explanation != "exact":
+            margin = approx_margin(group_bundle, explanation, tree_limit, fallback_margin)
+            close = np.flatnonzero(too_close(group_impact, margin))
+            if len(close):
+                exact = shap_matrix(X.iloc[close], group_bundle)
+                group_driver[close], group_impact[close] = top_drivers(X.columns, exact, top_n + 1)
+                group_method[close] = methods.index("exact")
+
+        driver[rows] = group_driver[:, :top_n]
+        impact[rows] = group_impact[:, :top_n]
+        method[rows] = group_method
+        version[rows] = len(versions)
+        versions.append(group_bundle.version)
+
+    results = {
+        "risk_probability": probability,
+        "risk_level": pd.Categorical.from_codes(
+            np.digitize(probability, RISK_THRESHOLDS), RISK_LEVELS
+        ),
+        "model_version": pd.Categorical.from_codes(version, versions or ["none"]),
+        "explanation_method": pd.Categorical.from_codes(method, methods),
+    }
+    for k in range(top_n):
+        results[f"driver_{k + 1}"] = pd.Categorical.from_codes(driver[:, k], ALL_DRIVERS)
+        results[f"impact_{k + 1}"] = impact[:, k]
+
+    return results
+
+
+def predict_risk_columnar(data, bundle=None, **kwargs):
+    """
+    score_columns con resultado como pyarrow.Table: las columnas numéricas
+    se pasan sin copiar y las de texto como columnas diccionario.
+    """
+    _require_pyarrow()
+
+    results = score_columns(data, bundle, **kwargs)
+    return pa.table({name: pa.array(values) for name, values in results.items()})
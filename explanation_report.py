@@ -0,0 +1,226 @@
+"""
+Informe de precisión y latencia de los modos de explicación aproximados.
+
+Compara cada método aproximado de model_utils.shap_matrix con TreeSHAP
+exacto sobre los mismos perfiles, al nivel que ve el usuario: los 5 drivers
+principales, agregados como en explain_result.
+
+Por método:
+  top1            mismo driver principal que SHAP exacto
+  top5_set        mismos cinco drivers, en cualquier orden
+  top5_shown      mismos cinco drivers, mismo orden y misma dirección: el
+                  usuario habría leído exactamente la misma explicación
+  kendall_tau     correlación de rangos sobre todos los drivers
+  impact_mae      error absoluto medio de los impactos por driver (log-odds)
+  impact_p95/p99  percentiles 95 y 99 de ese error
+  latency_ms      tiempo medio de la explicación
+y, con el fallback automático a SHAP exacto (drivers_too_close):
+  margin          margen de fallback usado: --margin, el medido para este
+                  modelo (ModelBundle.explanation_margins), o el impact_p99
+                  de esta ejecución si el método no está medido
+  fallback_rate   proporción de usuarios que pasan a SHAP exacto
+  top5_shown_fb   top5_shown con fallback: lo que garantiza el fallback,
+                  mientras el error de cada impacto no supere el margen
+  flipped_fb      usuarios a los que se muestra un driver con la dirección
+                  contraria a SHAP exacto (mensaje y plan de acción erróneos)
+  latency_fb_ms   tiempo medio incluyendo el SHAP exacto de los fallbacks
+
+Un método solo compensa si latency_fb_ms queda por debajo de la latencia
+exacta; con tasas de fallback cercanas a 1 es más lento que el exacto y no
+debe usarse.
+
+--write guarda el impact_p99 de cada método como su margen de fallback en el
+explanation_margins.json del bundle, para el modelo medido (modelo8, o
+modelo9 con --glucose-free). Las explicaciones aproximadas solo se pueden
+usar con un modelo que tenga márgenes medidos.
+
+Los perfiles son sintéticos (ver load_test.random_profile) salvo que --data
+apunte a un CSV con las columnas del formulario, como el dataset de
+entrenamiento.
+
+Ejemplos:
+  python explanation_report.py --samples 1000
+  python explanation_report.py --data diabetes_dataset.csv --margin 0.03
+  python explanation_report.py --samples 1000 --write
+  python explanation_report.py --samples 1000 --glucose-free --write
+"""
+
+import argparse
+import random
+import time
+
+import numpy as np
+import pandas as pd
+from scipy.stats import kendalltau
+
+import model_utils
+from load_test import random_profile
+from model_registry import GLUCOSE_FREE_MODEL_FILE, MODEL_FILE, save_margins
+from model_utils import (
+    aggregate_shap_by_driver_batch,
+    drivers_too_close,
+    prepare_input,
+    shap_matrix,
+)
+
+TOP_N = 5
+
+
+def load_profiles(data, samples, seed):
+    if data is None:
+        rng = random.Random(seed)
+        return [random_profile(rng) for _ in range(samples)]
+
+    df = pd.read_csv(data)
+    df = df.sample(n=min(samples, len(df)), random_state=seed)
+    return df.to_dict("records")
+
+
+def timed_drivers(X, bundle, method, tree_limit=None):
+    start = time.perf_counter()
+    impacts = shap_matrix(X, bundle, method, tree_limit)
+    driver_df = aggregate_shap_by_driver_batch(X.columns, impacts)[0]
+    return driver_df, time.perf_counter() - start
+
+
+def shown(driver_df):
+    """Lo que lee el usuario: los drivers principales en orden, con su dirección."""
+    top = driver_df.head(TOP_N)
+    return list(zip(top["driver"], top["impact"] > 0))
+
+
+def flipped(shown_df, exact_df):
+    """True si un driver mostrado va en dirección contraria a SHAP exacto."""
+    exact = exact_df.set_index("driver")["impact"]
+    top = shown_df.head(TOP_N)
+    return bool(((top["impact"] > 0) != (exact[top["driver"]].to_numpy() > 0)).any())
+
+
+def compare(exact_df, approx_df):
+    exact = exact_df.set_index("driver")["impact"]
+    approx = approx_df.set_index("driver")["impact"].reindex(exact.index).fillna(0.0)
+
+    tau, _ = kendalltau(exact.abs().rank(), approx.abs().rank())
+
+    return {
+        "top1": exact_df["driver"].iloc[0] == approx_df["driver"].iloc[0],
+        "top5_set": set(exact_df["driver"].head(TOP_N)) == set(approx_df["driver"].head(TOP_N)),
+        "top5_shown": shown(exact_df) == shown(approx_df),
+        "kendall_tau": tau,
+        "errors": (approx - exact).abs().to_numpy(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--samples", type=int, default=500)
+    parser.add_argument("--data", help="CSV of profiles with the form's columns")
+    parser.add_argument("--tree-limits", default="100,200,300",
+                        help="tree counts to evaluate for the truncated method")
+    parser.add_argument("--margin", type=float, default=None,
+                        help="fallback margin for every method "
+                             "(default: the margins measured for the model)")
+    parser.add_argument("--glucose-free", action="store_true",
+                        help="measure the bundle's glucose-free model (modelo9)")
+    parser.add_argument("--write", action="store_true",
+                        help="store each method's impact_p99 as the model's fallback margin")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--csv", help="also write the report to this CSV file")
+    args = parser.parse_args(argv)
+
+    bundle = model_utils.registry.current()
+    model_file = MODEL_FILE
+    if args.glucose_free:
+        if bundle.glucose_free is None:
+            parser.error(f"The active bundle has no {GLUCOSE_FREE_MODEL_FILE}.")
+        bundle, model_file = bundle.glucose_free, GLUCOSE_FREE_MODEL_FILE
+
+    profiles = load_profiles(args.data, args.samples, args.seed)
+
+    # El explainer Saabas se construye en la primera llamada: fuera del tiempo
+    bundle.path_explainer
+
+    methods = [("saabas", None)]
+    methods += [("truncated", int(k)) for k in args.tree_limits.split(",") if k.strip()]
+
+    stats = {m: [] for m in methods}
+    exact_times = []
+
+    for profile in profiles:
+        X = prepare_input(profile, bundle)
+        exact_df, exact_time = timed_drivers(X, bundle, "exact")
+        exact_times.append(exact_time)
+
+        for method, tree_limit in methods:
+            approx_df, approx_time = timed_drivers(X, bundle, method, tree_limit)
+            row = compare(exact_df, approx_df)
+            row.update(exact_df=exact_df, approx_df=approx_df,
+                       latency=approx_time, exact_latency=exact_time)
+
+            stats[(method, tree_limit)].append(row)
+
+    rows = [{
+        "method": "exact",
+        "top1": 1.0, "top5_set": 1.0, "top5_shown": 1.0, "kendall_tau": 1.0,
+        "impact_mae": 0.0, "impact_p95": 0.0, "impact_p99": 0.0,
+        "latency_ms": 1000 * np.mean(exact_times),
+        "margin": 0.0, "fallback_rate": 0.0, "top5_shown_fb": 1.0, "flipped_fb": 0.0,
+        "latency_fb_ms": 1000 * np.mean(exact_times),
+    }]
+
+    for (method, tree_limit), results in stats.items():
+        errors = np.concatenate([r["errors"] for r in results])
+
+        try:
+            margin = model_utils.approx_margin(bundle, method, tree_limit, args.margin)
+        except ValueError:
+            margin = np.percentile(errors, 99)
+
+        # Con fallback: si está demasiado ajustado se paga además el exacto
+        for r in results:
+            fallback = drivers_too_close(r["approx_df"], margin, TOP_N)
+            shown_df = r["exact_df"] if fallback else r["approx_df"]
+
+            r["fallback"] = fallback
+            r["top5_shown_fb"] = True if fallback else r["top5_shown"]
+            r["flipped_fb"] = flipped(shown_df, r["exact_df"])
+            r["latency_fb"] = r["latency"] + (r["exact_latency"] if fallback else 0.0)
+
+        rows.append({
+            "method": model_utils.method_label(method, tree_limit),
+            "top1": np.mean([r["top1"] for r in results]),
+            "top5_set": np.mean([r["top5_set"] for r in results]),
+            "top5_shown": np.mean([r["top5_shown"] for r in results]),
+            "kendall_tau": np.nanmean([r["kendall_tau"] for r in results]),
+            "impact_mae": errors.mean(),
+            "impact_p95": np.percentile(errors, 95),
+            "impact_p99": np.percentile(errors, 99),
+            "latency_ms": 1000 * np.mean([r["latency"] for r in results]),
+            "margin": margin,
+            "fallback_rate": np.mean([r["fallback"] for r in results]),
+            "top5_shown_fb": np.mean([r["top5_shown_fb"] for r in results]),
+            "flipped_fb": np.mean([r["flipped_fb"] for r in results]),
+            "latency_fb_ms": 1000 * np.mean([r["latency_fb"] for r in results]),
+        })
+
+    report = pd.DataFrame(rows)
+
+    print(f"{len(profiles)} profiles, model {bundle.version}")
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    if args.write:
+        measured = report[report["method"] != "exact"]
+        margins = {m: round(float(p99), 3) for m, p99 in zip(measured["method"], measured["impact_p99"])}
+        save_margins(bundle.path, model_file, margins)
+        print(f"Fallback margins for {model_file} written to {bundle.path}")
+
+    if args.csv:
+        report.to_csv(args.csv, index=False)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
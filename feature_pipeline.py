@@ -0,0 +1,137 @@
+import numpy as np
+import pandas as pd
+
+# =========================
+# FEATURE PIPELINE
+# =========================
+# La única definición de las features del modelo, compartida por el
+# entrenamiento (el notebook, con transform_frame) y la app (model_utils,
+# columnar). Todo trabaja sobre columnas numpy completas, así que una fila y
+# el dataset entero pasan por el mismo código.
+
+# Grupos (0, 35], (35, 50], (50, 65], (65, 100] -> 1..4
+AGE_BINS = [35, 50, 65]
+
+# Grupos (0, 4], (4, 7], (7, 24] -> 1..3
+SCREEN_TIME_BINS = [4, 7]
+
+# Grupos (0, 100], (100, 126], (126, 300] -> 0..2
+GLUCOSE_BINS = [100, 126]
+
+
+def encode_values(values, codes) -> np.ndarray:
+    """
+    Códigos de una columna categórica. Se busca cada valor distinto una sola
+    vez, no cada fila: las categorías son pocas y los lotes pueden ser grandes.
+    """
+    uniques, inverse = np.unique(np.asarray(values).astype(str), return_inverse=True)
+    unknown = codes["Unknown"]
+    lookup = np.array([codes.get(u, unknown) for u in uniques], dtype=int)
+    return lookup[inverse.reshape(-1)]
+
+
+def build_features(pl: dict, encodings=None) -> dict:
+    """
+    pl: dict columna -> np.ndarray con los inputs de uno o varios usuarios
+        (glucose_fasting puede ser None/NaN: lo usa el modelo sin glucosa)
+    encodings: tablas valor -> código por columna categórica
+        (ModelBundle.encodings); None si ya vienen las columnas _encoded
+    devuelve: el mismo dict con las columnas codificadas y derivadas añadidas
+    """
+
+    # =========================
+    # 1. Encoding categóricas
+    # =========================
+
+    # Tablas de solo lectura: nunca se toca el LabelEncoder, así que varias
+    # peticiones pueden codificar a la vez
+    for col, codes in (encodings or {}).items():
+        # Ya codificada (el notebook, o columnas Arrow, ver columnar.py)
+        if col + "_encoded" in pl:
+            continue
+
+        pl[col + "_encoded"] = encode_values(pl[col], codes)
+
+    # =========================
+    # 2. Feature engineering
+    # =========================
+
+    pl["age_group"] = np.digitize(pl["age"], AGE_BINS, right=True) + 1
+
+    # Diet score
+    diet = np.asarray(pl["diet_score"], dtype=float)
+    pl["poor_diet"] = (diet <= 4).astype(int)
+    pl["medium_diet"] = ((diet > 4) & (diet <= 6)).astype(int)
+    pl["healthy_diet"] = (diet > 6).astype(int)
+
+    # Sleep
+    sleep = np.asarray(pl["sleep_hours_per_day"], dtype=float)
+    pl["non_optimal_sleep"] = ((sleep < 6) | (sleep > 8)).astype(int)
+
+    # Physical activity: recomendación OMS de 150 min/semana
+    activity = np.asarray(pl["physical_activity_minutes_per_week"], dtype=float)
+    pl["meets_pa_guidelines"] = (activity >= 150).astype(int)
+    pl["sedentary"] = (activity < 150).astype(int)
+
+    # Screen time
+    screen = np.asarray(pl["screen_time_hours_per_day"], dtype=float)
+    pl["screen_time_category"] = np.digitize(screen, SCREEN_TIME_BINS, right=True) + 1
+
+    # BMI
+    bmi = np.asarray(pl["bmi"], dtype=float)
+    pl["obesity"] = (bmi >= 30).astype(int)
+    pl["overweight_or_obese"] = (bmi >= 25).astype(int)
+
+    # Obesidad central: el formulario de la app no pide la cintura/cadera
+    if "waist_to_hip_ratio" in pl:
+        pl["central_obesity"] = (np.asarray(pl["waist_to_hip_ratio"], dtype=float) > 0.85).astype(int)
+
+    # Sedentarismo digital: más de 6 h de pantallas y menos de 150 min de actividad
+    pl["high_screen_and_sedentary"] = ((screen > 6) & (activity < 150)).astype(int)
+
+    # Glucose fasting groups; NaN si no hay glucosa
+    glucose = np.asarray(pl["glucose_fasting"], dtype=float)
+    pl["glucose_fasting"] = glucose
+    pl["glucose_group"] = np.where(
+        np.isnan(glucose),
+        np.nan,
+        np.digitize(glucose, GLUCOSE_BINS, right=True)
+    )
+
+    # =========================
+    # 3. Interacciones
+    # =========================
+
+    pl["age_group*family_history_diabetes"] = (
+        pl["age_group"] * np.asarray(pl["family_history_diabetes"])
+    )
+
+    pl["overweight_or_obese*non_optimal_sleep"] = (
+        pl["overweight_or_obese"] * pl["non_optimal_sleep"]
+    )
+
+    return pl
+
+
+def check_features(pl, features):
+    """
+    Falla si alguna feature del modelo no se ha construido. Sin esto, la
+    feature entraría al modelo como NaN sin que nadie se enterase.
+    """
+    missing = [f for f in features if f not in pl]
+    if missing:
+        raise ValueError(f"Features not produced by the feature pipeline: {missing}")
+
+
+def transform_frame(df: pd.DataFrame, encodings=None, features=None) -> pd.DataFrame:
+    """
+    build_features para un DataFrame (el dataset de entrenamiento): devuelve
+    df con las columnas derivadas añadidas, o solo `features` si se indican.
+    """
+    pl = build_features({col: df[col].to_numpy() for col in df.columns}, encodings)
+
+    if features is not None:
+        check_features(pl, features)
+        pl = {f: pl[f] for f in features}
+
+    return pd.DataFrame(pl, index=df.index)
@@ -0,0 +1,377 @@
+"""
+Banco de pruebas de carga local para PreMed.
+
+Somete el camino de puntuación a una carga creciente e informa, por paso,
+del throughput, los percentiles de latencia y la tasa de errores, para
+dimensionar las instancias de la app.
+
+Dos modelos de carga:
+  --users 1,2,4,8   bucle cerrado: N usuarios simulados, cada uno envía el
+                    formulario, lee el resultado (--think-time) y repite
+  --rates 5,10,20   bucle abierto: llegadas de Poisson a R peticiones por
+                    segundo; la latencia incluye el tiempo que la petición
+                    esperó a empezar
+
+Dos objetivos:
+  direct  llama a predict_risk_with_explanation_and_action desde un hilo
+          por sesión simulada, como los hilos de script de Streamlit
+  app     envía el "health_form" real de app.py con el AppTest de
+          Streamlit (validación, renderizado y registro de casos
+          incluidos). Las sesiones de AppTest no pueden ejecutarse a la
+          vez en un proceso, así que este objetivo solo admite --users 1:
+          sirve para medir lo que añade la página completa por envío,
+          además de la puntuación
+
+Ejemplos:
+  python load_test.py --users 1,2,4,8,16 --duration 20
+  python load_test.py --rates 5,10,20,40 --duration 30 --slo-ms 500
+  python load_test.py --target app --users 1 --csv load_app.csv
+"""
+
+import argparse
+import os
+import queue
+import random
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_PATH = os.path.join(BASE_DIR, "app.py")
+
+# =========================
+# SIMULATED PROFILES
+# =========================
+
+def random_profile(rng: random.Random) -> dict:
+    """Un envío plausible del formulario, variado para que ninguna caché oculte el coste."""
+    weight = round(rng.uniform(50, 120), 1)
+    height_cm = round(rng.uniform(150, 195), 1)
+
+    return {
+        "age": rng.randint(18, 85),
+        "gender": rng.choice(["Female", "Male", "Other"]),
+        "ethnicity": rng.choice(["European", "Asian", "African", "Hispanic", "Other"]),
+        "income_level": rng.choice(["Low", "Lower-Middle", "Middle", "Upper-Middle", "High"]),
+        "education_level": rng.choice(["No formal", "Highschool", "Graduate", "Postgraduate"]),
+        "employment_status": rng.choice(["Employed", "Unemployed", "Retired", "Student"]),
+        "smoking_status": rng.choice(["Never", "Former", "Smoker"]),
+        "family_history_diabetes": rng.randint(0, 1),
+        "hypertension_history": rng.randint(0, 1),
+        "cardiovascular_history": rng.randint(0, 1),
+        "heart_rate": rng.randint(50, 100),
+        "alcohol_consumption_per_week": rng.randint(0, 14),
+        "diet_score": round(rng.uniform(0, 10), 1),
+        "sleep_hours_per_day": round(rng.uniform(4, 10), 1),
+        "weight": weight,
+        "height_cm": height_cm,
+        "bmi": weight / (height_cm / 100) ** 2,
+        "screen_time_hours_per_day": round(rng.uniform(0, 12), 1),
+        "physical_activity_minutes_per_week": rng.randint(0, 600),
+        "ldl_cholesterol": round(rng.uniform(60, 200), 1),
+        "glucose_fasting": round(rng.uniform(70, 200), 1)
+    }
+
+# =========================
+# TARGETS
+# =========================
+# Un objetivo es una factoría que devuelve una "sesión": una función que
+# envía un perfil y lanza una excepción si falla. Cada hilo tiene la suya.
+
+def direct_target():
+    from model_utils import predict_risk_with_explanation_and_action
+
+    model_inputs = [
+        "age", "gender", "ethnicity", "income_level", "education_level",
+        "employment_status", "smoking_status", "family_history_diabetes",
+        "hypertension_history", "cardiovascular_history", "heart_rate",
+        "alcohol_consumption_per_week", "diet_score", "sleep_hours_per_day",
+        "bmi", "screen_time_hours_per_day", "physical_activity_minutes_per_week",
+        "ldl_cholesterol", "glucose_fasting"
+    ]
+
+    def new_session():
+        def submit(profile):
+            predict_risk_with_explanation_and_action({k: profile[k] for k in model_inputs})
+        return submit
+
+    return new_session
+
+
+# Etiquetas de los widgets del formulario en app.py
+APP_NUMBER_INPUTS = {
+    "Age": "age",
+    "Physical activity (minutes per week)": "physical_activity_minutes_per_week",
+    "Alcohol (drinks per week)": "alcohol_consumption_per_week",
+    "Weight (kg)": "weight",
+    "Height (cm)": "height_cm",
+    "Resting heart rate": "heart_rate",
+    "LDL cholesterol (mg/dL)": "ldl_cholesterol",
+    "Fasting glucose (mg/dL)": "glucose_fasting",
+}
+
+APP_SELECTBOXES = {
+    "Gender": "gender",
+    "Ethnicity": "ethnicity",
+    "Income level": "income_level",
+    "Education level": "education_level",
+    "Employment status": "employment_status",
+    "Smoking status": "smoking_status",
+    "Family history of diabetes": "family_history_diabetes",
+    "Hypertension history": "hypertension_history",
+    "Cardiovascular disease history": "cardiovascular_history",
+}
+
+APP_SLIDERS = {
+    "Sleep hours per night": "sleep_hours_per_day",
+    "Diet quality (0 = poor, 10 = excellent)": "diet_score",
+    "Screen time (hours/day)": "screen_time_hours_per_day",
+}
+
+
+def app_target(timeout: float = 60):
+    from streamlit.testing.v1 import AppTest
+
+    def new_session():
+        at = AppTest.from_file(APP_PATH, default_timeout=timeout).run()
+        if at.exception:
+            raise RuntimeError(f"app.py failed to start: {at.exception[0].message}")
+
+        def submit(profile):
+            for widgets, mapping in (
+                (at.number_input, APP_NUMBER_INPUTS),
+                (at.selectbox, APP_SELECTBOXES),
+                (at.slider, APP_SLIDERS),
+            ):
+                for widget in widgets:
+                    if widget.label in mapping:
+                        widget.set_value(profile[mapping[widget.label]])
+
+            at.button[0].click().run()
+
+            if at.exception:
+                raise RuntimeError(at.exception[0].message)
+            if at.error:
+                raise RuntimeError(at.error[0].value)
+
+        return submit
+
+    return new_session
+
+
+TARGETS = {"direct": direct_target, "app": app_target}
+
+# =========================
+# LOAD MODELS
+# =========================
+
+class Recorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.latencies = []
+        self.errors = []
+
+    def record(self, latency, error=None):
+        with self._lock:
+            if error is None:
+                self.latencies.append(latency)
+            else:
+                self.errors.append(repr(error))
+
+
+def _timed_submit(submit, profile, recorder, started):
+    try:
+        submit(profile)
+    except Exception as e:
+        recorder.record(None, e)
+    else:
+        recorder.record(time.perf_counter() - started)
+
+
+def run_closed_loop(new_session, users, duration, think_time, seed):
+    """`users` sesiones envían una tras otra (más el think time) durante `duration` s."""
+    recorder = Recorder()
+    ready = threading.Barrier(users + 1)
+
+    def user_loop(i):
+        rng = random.Random(seed + i)
+        try:
+            submit = new_session()
+        except Exception as e:
+            recorder.record(None, e)
+            ready.wait()
+            return
+
+        ready.wait()
+        deadline = time.perf_counter() + duration
+
+        while time.perf_counter() < deadline:
+            _timed_submit(submit, random_profile(rng), recorder, time.perf_counter())
+            if think_time:
+                time.sleep(rng.expovariate(1 / think_time))
+
+    threads = [threading.Thread(target=user_loop, args=(i,), daemon=True) for i in range(users)]
+    for t in threads:
+        t.start()
+
+    # Las sesiones se crean antes de empezar a medir: solo cuenta el régimen estable
+    ready.wait()
+    start = time.perf_counter()
+
+    for t in threads:
+        t.join()
+
+    return recorder, time.perf_counter() - start
+
+
+def run_open_loop(new_session, rate, duration, max_workers, seed):
+    """Llegadas de Poisson a `rate` pet/s durante `duration` s, servidas por un pool de hilos."""
+    recorder = Recorder()
+    rng = random.Random(seed)
+    local = threading.local()
+
+    # Con el objetivo app las sesiones son caras: se crean una vez, al principio
+    sessions = queue.Queue()
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        for s in pool.map(lambda _: new_session(), range(max_workers)):
+            sessions.put(s)
+
+    def handle(profile, scheduled):
+        if not hasattr(local, "submit"):
+            local.submit = sessions.get()
+        _timed_submit(local.submit, profile, recorder, scheduled)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        start = time.perf_counter()
+        next_arrival = start
+
+        while next_arrival < start + duration:
+            delay = next_arrival - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+            # La latencia cuenta desde la llegada programada, no desde que un
+            # hilo quedó libre, así que la saturación aparece como espera en cola
+            pool.submit(handle, random_profile(rng), next_arrival)
+            next_arrival += rng.expovariate(rate)
+
+    return recorder, time.perf_counter() - start
+
+# =========================
+# REPORT
+# =========================
+
+def summarise(load, recorder, elapsed) -> dict:
+    latencies = np.array(recorder.latencies) * 1000
+    n_errors = len(recorder.errors)
+    total = len(latencies) + n_errors
+
+    row = {
+        "load": load,
+        "requests": total,
+        "throughput_rps": len(latencies) / elapsed if elapsed else 0.0,
+        "error_rate": n_errors / total if total else 0.0,
+    }
+
+    for name, q in (("p50_ms", 50), ("p95_ms", 95), ("p99_ms", 99)):
+        row[name] = float(np.percentile(latencies, q)) if len(latencies) else float("nan")
+
+    row["max_ms"] = float(latencies.max()) if len(latencies) else float("nan")
+    return row
+
+
+def parse_levels(text):
+    return [float(x) if "." in x else int(x) for x in text.split(",") if x.strip()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--target", choices=sorted(TARGETS), default="direct")
+
+    load = parser.add_mutually_exclusive_group()
+    load.add_argument("--users", type=parse_levels, help="closed-loop user counts, e.g. 1,2,4,8")
+    load.add_argument("--rates", type=parse_levels, help="open-loop arrival rates (req/s), e.g. 5,10,20")
+
+    parser.add_argument("--duration", type=float, default=15.0, help="seconds per load step")
+    parser.add_argument("--think-time", type=float, default=0.0,
+                        help="mean pause between a user's submissions, in seconds (closed loop)")
+    parser.add_argument("--max-workers", type=int, default=32,
+                        help="concurrent sessions serving open-loop arrivals")
+    parser.add_argument("--slo-ms", type=float, default=None,
+                        help="stop ramping once p95 latency exceeds this")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--csv", help="also write the report to this CSV file")
+    args = parser.parse_args(argv)
+
+    if args.users is None and args.rates is None:
+        args.users = [1] if args.target == "app" else [1, 2, 4, 8]
+
+    if args.target == "app" and (args.rates is not None or max(args.users) > 1):
+        parser.error("the app target supports a single user only (--users 1)")
+
+    if args.csv:
+        args.csv = os.path.abspath(args.csv)
+
+    if args.target == "app":
+        # Las sesiones registran casos: que no acaben en el log real
+        sys.path.insert(0, BASE_DIR)
+        os.chdir(tempfile.mkdtemp(prefix="premed-load-"))
+
+    new_session = TARGETS[args.target]()
+
+    # Calentamiento: carga del modelo y primeras llamadas fuera de la medición
+    warm = new_session()
+    rng = random.Random(args.seed)
+    for _ in range(3):
+        warm(random_profile(rng))
+
+    rows = []
+    levels = args.users if args.users is not None else args.rates
+
+    for level in levels:
+        if args.users is not None:
+            recorder, elapsed = run_closed_loop(
+                new_session, level, args.duration, args.think_time, args.seed
+            )
+            label = f"{level} users"
+        else:
+            recorder, elapsed = run_open_loop(
+                new_session, level, args.duration, args.max_workers, args.seed
+            )
+            label = f"{level} req/s"
+
+        row = summarise(label, recorder, elapsed)
+        rows.append(row)
+
+        print(
+            f"{label:>12}: {row['throughput_rps']:7.1f} req/s  "
+            f"p50 {row['p50_ms']:7.1f} ms  p95 {row['p95_ms']:7.1f} ms  "
+            f"p99 {row['p99_ms']:7.1f} ms  errors {row['error_rate']:.1%}",
+            flush=True
+        )
+        if recorder.errors:
+            print(f"{'':>14}first error: {recorder.errors[0]}", flush=True)
+
+        if args.slo_ms is not None and row["p95_ms"] > args.slo_ms:
+            print(f"p95 above {args.slo_ms:.0f} ms SLO: stopping the ramp.")
+            break
+
+    report = pd.DataFrame(rows)
+    print()
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    if args.csv:
+        report.to_csv(args.csv, index=False)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
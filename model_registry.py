@@ -0,0 +1,360 @@
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from dataclasses import dataclass, field
+from functools import cached_property
+from datetime import datetime
+from types import MappingProxyType
+
+import shap
+
+from tree_attribution import saabas_explainer
+
+logger = logging.getLogger(__name__)
+
+# =========================
+# ARTIFACT BUNDLE
+# =========================
+
+MODEL_FILE = "modelo8.pkl"
+ENCODERS_FILE = "encoders.pkl"
+FEATURES_FILE = "features.pkl"
+
+# Se escribe el último al publicar un directorio de bundle: lo marca como completo
+VERSION_FILE = "VERSION"
+
+BUNDLE_FILES = (MODEL_FILE, ENCODERS_FILE, FEATURES_FILE)
+
+# Opcional: modelo entrenado sin glucosa (lista5 en el notebook), para
+# usuarios que no conocen su glucosa en ayunas
+GLUCOSE_FREE_MODEL_FILE = "modelo9.pkl"
+GLUCOSE_FEATURES = ["glucose_fasting", "glucose_group"]
+
+# Opcional: error medido de las explicaciones aproximadas de cada modelo del
+# bundle (explanation_report.py --write), junto con el hash del modelo con
+# que se midió. Sin él, esos modos no se pueden usar con el modelo.
+MARGINS_FILE = "explanation_margins.json"
+
+
+@dataclass(frozen=True)
+class ModelBundle:
+    """
+    Todo lo que necesita una petición para puntuar a un usuario, cargado a
+    la vez.
+
+    De solo lectura una vez cargado, así que cualquier número de hilos puede
+    compartirlo: los encoders se guardan solo como tablas congeladas
+    (`encodings`), nunca como objetos LabelEncoder, y las features son una
+    tupla.
+    """
+
+    version: str
+    model: object
+    encodings: MappingProxyType
+    features: tuple
+    explainer: object
+    path: str
+    loaded_at: datetime
+    # Bundle del modelo sin glucosa, con los mismos encoders; None si no hay
+    glucose_free: "ModelBundle" = None
+    # Método aproximado ("saabas", "truncated(200)") -> margen de fallback
+    # medido para este modelo; vacío si no se ha medido
+    explanation_margins: MappingProxyType = field(default_factory=lambda: MappingProxyType({}))
+
+    @cached_property
+    def path_explainer(self):
+        """
+        Explicaciones aproximadas (Saabas); None si el modelo no las admite.
+
+        Se construye la primera vez que se pide: aplanar los árboles cuesta
+        más de un segundo y el modo aproximado es opcional, así que no se
+        paga en cada carga ni puede hacer fallar un bundle válido. Es una
+        caché de solo escritura única: el bundle sigue siendo inmutable.
+        """
+        return saabas_explainer(self.model)
+
+
+def bundle_version(path: str) -> str:
+    """
+    Versión del bundle en `path`: el contenido de su fichero VERSION o, si
+    el directorio no tiene versión, un hash corto del fichero del modelo.
+    """
+    version_path = os.path.join(path, VERSION_FILE)
+    if os.path.exists(version_path):
+        with open(version_path) as f:
+            version = f.read().strip()
+        if version:
+            return version
+
+    with open(os.path.join(path, MODEL_FILE), "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    return f"{os.path.splitext(MODEL_FILE)[0]}-{digest[:8]}"
+
+
+def encoding_tables(label_encoders: dict) -> MappingProxyType:
+    """
+    Tabla de solo lectura clase -> código por columna categórica, siempre
+    con "Unknown". Los códigos coinciden con LabelEncoder.transform.
+    """
+    tables = {}
+    for col, le in label_encoders.items():
+        classes = list(le.classes_)
+        if "Unknown" not in classes:
+            classes.append("Unknown")
+        tables[col] = MappingProxyType({c: i for i, c in enumerate(classes)})
+
+    return MappingProxyType(tables)
+
+
+def read_model(path: str, model_file: str):
+    """(modelo, sha256 del fichero) de `model_file` en el bundle `path`."""
+    with open(os.path.join(path, model_file), "rb") as f:
+        data = f.read()
+
+    return pickle.loads(data), hashlib.sha256(data).hexdigest()
+
+
+def read_margins(path: str) -> dict:
+    margins_path = os.path.join(path, MARGINS_FILE)
+    if not os.path.exists(margins_path):
+        return {}
+
+    with open(margins_path) as f:
+        return json.load(f)
+
+
+def load_margins(path: str, model_file: str, digest: str) -> MappingProxyType:
+    """
+    Márgenes medidos para `model_file`. Vacío si no se han medido o si se
+    midieron con otro fichero de modelo: nunca se aplican a un modelo
+    distinto del que se midió.
+    """
+    entry = read_margins(path).get(model_file)
+    if entry is None:
+        return MappingProxyType({})
+
+    if entry.get("sha256") != digest:
+        logger.warning(
+            "%s in %s was measured for a different %s; approximate "
+            "explanations are disabled for it", MARGINS_FILE, path, model_file
+        )
+        return MappingProxyType({})
+
+    return MappingProxyType(dict(entry["margins"]))
+
+
+def save_margins(path: str, model_file: str, margins: dict):
+    """Guarda los márgenes de `model_file` en el MARGINS_FILE del bundle."""
+    with open(os.path.join(path, model_file), "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+
+    measured = read_margins(path)
+    measured[model_file] = {"sha256": digest, "margins": margins}
+
+    with open(os.path.join(path, MARGINS_FILE), "w") as f:
+        json.dump(measured, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_bundle(path: str, version: str = None) -> ModelBundle:
+    model, digest = read_model(path, MODEL_FILE)
+
+    with open(os.path.join(path, ENCODERS_FILE), "rb") as f:
+        label_encoders = pickle.load(f)
+
+    with open(os.path.join(path, FEATURES_FILE), "rb") as f:
+        features = pickle.load(f)
+
+    version = version or bundle_version(path)
+    loaded_at = datetime.now()
+    encodings = encoding_tables(label_encoders)
+    features = tuple(features)
+
+    glucose_free = None
+    glucose_free_path = os.path.join(path, GLUCOSE_FREE_MODEL_FILE)
+    if os.path.exists(glucose_free_path):
+        glucose_free_model, glucose_free_digest = read_model(path, GLUCOSE_FREE_MODEL_FILE)
+
+        # Las features de features.pkl sin las de glucosa, en el orden con
+        # que se entrenó modelo9: si no coinciden, las columnas entrarían
+        # desplazadas al modelo sin ningún error
+        glucose_free_features = tuple(f for f in features if f not in GLUCOSE_FEATURES)
+        trained_on = tuple(glucose_free_model.feature_name_)
+        if glucose_free_features != trained_on:
+            raise ValueError(
+                f"{GLUCOSE_FREE_MODEL_FILE} was trained on {list(trained_on)}, "
+                f"but {FEATURES_FILE} without {GLUCOSE_FEATURES} gives "
+                f"{list(glucose_free_features)}."
+            )
+
+        glucose_free = ModelBundle(
+            version=f"{version}-no-glucose",
+            model=glucose_free_model,
+            encodings=encodings,
+            features=glucose_free_features,
+            explainer=shap.TreeExplainer(glucose_free_model),
+            path=os.path.abspath(path),
+            loaded_at=loaded_at,
+            explanation_margins=load_margins(path, GLUCOSE_FREE_MODEL_FILE, glucose_free_digest)
+        )
+
+    return ModelBundle(
+        version=version,
+        model=model,
+        encodings=encodings,
+        features=features,
+        explainer=shap.TreeExplainer(model),
+        path=os.path.abspath(path),
+        loaded_at=loaded_at,
+        glucose_free=glucose_free,
+        explanation_margins=load_margins(path, MODEL_FILE, digest)
+    )
+
+
+def is_complete_bundle(path: str) -> bool:
+    return all(
+        os.path.isfile(os.path.join(path, name))
+        for name in BUNDLE_FILES + (VERSION_FILE,)
+    )
+
+# =========================
+# REGISTRY
+# =========================
+
+class ModelRegistry:
+    """
+    Guarda el ModelBundle activo y lo cambia por otros nuevos sin reiniciar.
+
+    Los bundles nuevos se cargan y calientan en un hilo aparte y solo
+    entonces se publican, con una única asignación de referencia. Cada
+    petición debe leer `current()` una vez y usar ese bundle hasta el final,
+    así que una petición que empezó con la versión anterior acaba con ella.
+    """
+
+    def __init__(self, warmup=None):
+        self._warmup = warmup
+        self._lock = threading.Lock()
+        self._active = None
+        self._seen_paths = set()
+        self._watcher = None
+        self.history = []
+
+    def current(self) -> ModelBundle:
+        bundle = self._active
+        if bundle is None:
+            raise RuntimeError("No model bundle has been loaded yet.")
+        return bundle
+
+    def load(self, path: str, version: str = None, background: bool = False):
+        """
+        Carga el bundle de `path` y lo hace el activo.
+
+        Con background=True devuelve al momento el hilo de carga; el bundle
+        actual sigue sirviendo hasta que el nuevo está caliente.
+        """
+        path = os.path.abspath(path)
+        with self._lock:
+            self._seen_paths.add(path)
+
+        if not background:
+            return self._load_and_swap(path, version)
+
+        thread = threading.Thread(
+            target=self._load_and_swap_safely,
+            args=(path, version),
+            name=f"model-load-{os.path.basename(path)}",
+            daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _load_and_swap(self, path, version):
+        bundle = load_bundle(path, version)
+
+        if self._warmup is not None:
+            self._warmup(bundle)
+
+        with self._lock:
+            previous = self._active
+            self._active = bundle
+            self.history.append((bundle.version, bundle.loaded_at))
+
+        logger.info(
+            "Model bundle %s is now active (previous: %s)",
+            bundle.version,
+            previous.version if previous is not None else None
+        )
+        return bundle
+
+    def _load_and_swap_safely(self, path, version):
+        try:
+            self._load_and_swap(path, version)
+        except Exception:
+            # Un bundle roto nunca debe tumbar el que ya está sirviendo
+            logger.exception("Could not load model bundle from %s", path)
+
+    # =========================
+    # DIRECTORY WATCHER
+    # =========================
+
+    def scan(self, directory: str):
+        """
+        Carga el bundle completo más reciente de `directory` que no se haya
+        visto antes.
+
+        Cada bundle vive en su propio subdirectorio (p. ej. models/2026-03-01/)
+        y se recoge en cuanto existe su fichero VERSION.
+        """
+        if not os.path.isdir(directory):
+            return None
+
+        candidates = []
+        for name in os.listdir(directory):
+            path = os.path.abspath(os.path.join(directory, name))
+            if path in self._seen_paths or not is_complete_bundle(path):
+                continue
+            candidates.append(path)
+
+        if not candidates:
+            return None
+
+        newest = max(
+            candidates,
+            key=lambda p: os.path.getmtime(os.path.join(p, VERSION_FILE))
+        )
+
+        # Los bundles anteriores sin ver ya han quedado superados
+        with self._lock:
+            self._seen_paths.update(candidates)
+
+        return self.load(newest, background=True)
+
+    def watch(self, directory: str, interval: float = 30.0):
+        """Busca bundles nuevos en `directory` cada `interval` segundos."""
+        with self._lock:
+            if self._watcher is not None:
+                return self._watcher
+
+            stop = threading.Event()
+
+            def poll():
+                while True:
+                    try:
+                        self.scan(directory)
+                    except Exception:
+                        logger.exception("Model directory scan failed")
+
+                    if stop.wait(interval):
+                        return
+
+            self._watcher = threading.Thread(
+                target=poll, name="model-watcher", daemon=True
+            )
+            self._watcher.stop = stop
+            self._watcher.start()
+
+        return self._watcher
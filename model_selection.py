@@ -0,0 +1,361 @@
+"""
+Comparativa para elegir modelo: calidad en test junto al coste de servirlo.
+
+El notebook eligió modelo8 solo por accuracy/recall/F1. Este script pone
+los mismos candidatos al lado de lo que cuesta servirlos, y marca los que
+están en el frente de Pareto (ningún otro candidato es al menos igual de
+bueno en todas las columnas y mejor en alguna).
+
+Candidatos (hiperparámetros como en el notebook):
+  modelo5  RandomForest, 500 árboles, max_depth 24, class_weight balanced
+  modelo6  XGBoost, 500 árboles, max_depth 24              (requiere xgboost)
+  modelo7  RandomForest sobre datos remuestreados con SMOTE, ratio 0.9
+                                                           (requiere imbalanced-learn)
+  modelo8  LightGBM, 500 árboles, learning_rate 0.05, max_depth 24
+
+Todos usan las features de producción (features.pkl), construidas a partir
+de las columnas originales con feature_pipeline, el mismo código que usa la
+app: se comparan con exactamente lo que la app les daría.
+
+Con --data (el dataset original, con diagnosed_diabetes como objetivo) los
+datos se dividen como en el notebook (80/20, estratificado, random_state
+42). Un candidato cuyo modeloN.pkl existe en --models-dir (por defecto
+models/candidates) se carga; si no, se entrena con la partición de
+entrenamiento (--retrain obliga a entrenar, --save guarda los pickles). Sin
+--data solo se miden los pickles existentes, con perfiles sintéticos, y las
+columnas de calidad quedan vacías. --save nunca escribe en el directorio
+del bundle que se está sirviendo: un candidato se promociona publicando un
+directorio de bundle nuevo.
+
+Cada candidato se publica en un directorio de bundle temporal (con los
+encoders y features del bundle activo) y se carga con load_bundle, y todos
+los costes se miden con las funciones con que sirve la app.
+
+Columnas:
+  accuracy, precision, recall, f1   en test, umbral 0.5 (como saca_metricas)
+  auc                               ROC-AUC en test a partir de probabilidades
+  single_ms       mediana de la latencia de model_probabilities para una fila
+  batch_rows_s    throughput de model_probabilities en lotes de --batch-size filas
+  shap_ms         tiempo medio de shap_matrix exacto para una fila (la app
+                  explica cada caso)
+  size_mb         tamaño del pickle del modelo
+  load_ms         tiempo de load_bundle para el bundle del candidato
+  pareto          en el frente de --metric frente a las cinco columnas de coste
+
+Ejemplos:
+  python model_selection.py --data diabetes_dataset.csv --save
+  python model_selection.py --csv selection.csv
+  python model_selection.py --models-dir . --candidates modelo8
+"""
+
+import argparse
+import os
+import pickle
+import random
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import (
+    accuracy_score,
+    f1_score,
+    precision_score,
+    recall_score,
+    roc_auc_score,
+)
+from sklearn.model_selection import train_test_split
+
+from load_test import random_profile
+from feature_pipeline import transform_frame
+from model_registry import ENCODERS_FILE, FEATURES_FILE, MODEL_FILE, VERSION_FILE, load_bundle
+from model_utils import (
+    BASE_DIR,
+    columns_from_inputs,
+    model_probabilities,
+    registry,
+    shap_matrix,
+)
+
+TARGET = "diagnosed_diabetes"
+
+# Fuera del bundle servido: los pickles de los candidatos pesan cientos de MB
+CANDIDATES_DIR = os.path.join(BASE_DIR, "models", "candidates")
+
+QUALITY_COLUMNS = ["accuracy", "precision", "recall", "f1", "auc"]
+
+# Columna -> True si cuanto más alto mejor
+COST_COLUMNS = {
+    "single_ms": False,
+    "batch_rows_s": True,
+    "shap_ms": False,
+    "size_mb": False,
+    "load_ms": False,
+}
+
+# =========================
+# CANDIDATES
+# =========================
+# Cada factoría devuelve un modelo sin entrenar, o lanza ImportError si su
+# librería no está instalada. fit_candidate se encarga del paso de SMOTE.
+
+def modelo5():
+    return RandomForestClassifier(
+        max_depth=24, n_estimators=500, random_state=42, class_weight="balanced"
+    )
+
+
+def modelo6():
+    from xgboost import XGBClassifier
+
+    return XGBClassifier(max_depth=24, n_estimators=500, random_state=42)
+
+
+def modelo7():
+    # SMOTE se aplica en fit_candidate; aquí solo comprobamos que está
+    import imblearn  # noqa: F401
+
+    return RandomForestClassifier(random_state=42, class_weight="balanced")
+
+
+def modelo8():
+    from lightgbm import LGBMClassifier
+
+    return LGBMClassifier(
+        n_estimators=500, learning_rate=0.05, max_depth=24, random_state=42, verbose=-1
+    )
+
+
+CANDIDATES = {
+    "modelo5": modelo5,
+    "modelo6": modelo6,
+    "modelo7": modelo7,
+    "modelo8": modelo8,
+}
+
+
+def fit_candidate(name, X_train, y_train):
+    model = CANDIDATES[name]()
+
+    if name == "modelo7":
+        from imblearn.over_sampling import SMOTE
+
+        sm = SMOTE(random_state=42, sampling_strategy=0.9)
+        X_train, y_train = sm.fit_resample(X_train, y_train)
+
+    return model.fit(X_train, y_train)
+
+# =========================
+# DATA
+# =========================
+
+def load_data(data, bundle, samples, seed):
+    """(X_train, X_test, y_train, y_test); y_* son None sin --data."""
+    if data is None:
+        rng = random.Random(seed)
+        profiles = [random_profile(rng) for _ in range(samples)]
+        df = pd.DataFrame(columns_from_inputs(profiles))
+        X = transform_frame(df, bundle.encodings, bundle.features)
+        return None, X, None, None
+
+    df = pd.read_csv(data)
+    X = transform_frame(df, bundle.encodings, bundle.features)
+    y = df[TARGET].to_numpy()
+
+    return train_test_split(X, y, test_size=0.2, random_state=42, stratify=y)
+
+# =========================
+# MEASUREMENTS
+# =========================
+
+def quality(bundle, X_test, y_test):
+    proba = model_probabilities(X_test, bundle)
+    y_pred = (proba >= 0.5).astype(int)
+
+    return {
+        "accuracy": accuracy_score(y_test, y_pred),
+        "precision": precision_score(y_test, y_pred),
+        "recall": recall_score(y_test, y_pred),
+        "f1": f1_score(y_test, y_pred),
+        "auc": roc_auc_score(y_test, proba),
+    }
+
+
+def single_row_ms(bundle, X, repeats):
+    times = []
+    for i in range(repeats):
+        row = X.iloc[[i % len(X)]]
+        start = time.perf_counter()
+        model_probabilities(row, bundle)
+        times.append(time.perf_counter() - start)
+    return 1000 * np.median(times)
+
+
+def batch_rows_per_s(bundle, X, batch_size):
+    start = time.perf_counter()
+    for i in range(0, len(X), batch_size):
+        model_probabilities(X.iloc[i:i + batch_size], bundle)
+    return len(X) / (time.perf_counter() - start)
+
+
+def shap_ms(bundle, X, rows):
+    rows = min(rows, len(X))
+    start = time.perf_counter()
+    for i in range(rows):
+        shap_matrix(X.iloc[[i]], bundle)
+    return 1000 * (time.perf_counter() - start) / rows
+
+
+def artifact_cost(name, model, active):
+    """
+    Publica `model` como bundle (con los encoders y features de `active`) y
+    lo carga con load_bundle: tamaño del pickle (MB), tiempo de carga (ms) y
+    el ModelBundle cargado.
+    """
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, MODEL_FILE), "wb") as f:
+            pickle.dump(model, f)
+        size_mb = os.path.getsize(os.path.join(tmp, MODEL_FILE)) / 1e6
+
+        for file_name in (ENCODERS_FILE, FEATURES_FILE):
+            shutil.copy(os.path.join(active.path, file_name), tmp)
+        with open(os.path.join(tmp, VERSION_FILE), "w") as f:
+            f.write(name)
+
+        start = time.perf_counter()
+        bundle = load_bundle(tmp)
+        load_ms = 1000 * (time.perf_counter() - start)
+
+    return size_mb, load_ms, bundle
+
+# =========================
+# PARETO FRONT
+# =========================
+
+def pareto_front(report: pd.DataFrame, objectives: dict) -> pd.Series:
+    """
+    objectives: columna -> True si más alto es mejor
+    devuelve: True para las filas que ninguna otra domina
+    """
+    # Todo a "más alto es mejor"
+    values = np.column_stack([
+        report[col].to_numpy(dtype=float) * (1 if higher else -1)
+        for col, higher in objectives.items()
+    ])
+
+    front = []
+    for row in values:
+        dominated = (
+            (values >= row).all(axis=1) & (values > row).any(axis=1)
+        ).any()
+        front.append(not dominated)
+
+    return pd.Series(front, index=report.index)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--data", help="raw dataset CSV (diabetes_dataset.csv)")
+    parser.add_argument("--models-dir", default=CANDIDATES_DIR,
+                        help="where modeloN.pkl are loaded from and saved to")
+    parser.add_argument("--candidates", default=",".join(CANDIDATES))
+    parser.add_argument("--retrain", action="store_true",
+                        help="train every candidate even if its pickle exists")
+    parser.add_argument("--save", action="store_true",
+                        help="write trained candidates to --models-dir")
+    parser.add_argument("--metric", default="auc", choices=QUALITY_COLUMNS,
+                        help="quality column used for the Pareto front")
+    parser.add_argument("--samples", type=int, default=2000,
+                        help="synthetic profiles when --data is not given")
+    parser.add_argument("--single-repeats", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--shap-rows", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--csv", help="also write the report to this CSV file")
+    args = parser.parse_args(argv)
+
+    bundle = registry.current()
+
+    # modelo8.pkl es también el nombre del modelo servido: --save lo pisaría
+    if args.save and os.path.realpath(args.models_dir) == os.path.realpath(bundle.path):
+        parser.error(
+            f"--models-dir is the active bundle's directory ({bundle.path}); "
+            "--save would overwrite the model being served."
+        )
+
+    X_train, X_test, y_train, y_test = load_data(args.data, bundle, args.samples, args.seed)
+
+    rows = []
+    for name in [c.strip() for c in args.candidates.split(",") if c.strip()]:
+        if name not in CANDIDATES:
+            parser.error(f"Unknown candidate '{name}'. Use some of {list(CANDIDATES)}.")
+
+        path = os.path.join(args.models_dir, f"{name}.pkl")
+
+        try:
+            if os.path.exists(path) and not args.retrain:
+                with open(path, "rb") as f:
+                    model = pickle.load(f)
+                source = "loaded"
+            elif X_train is not None:
+                print(f"Training {name}...", flush=True)
+                model = fit_candidate(name, X_train, y_train)
+                source = "trained"
+            else:
+                print(f"Skipping {name}: no {path} and no --data to train it.")
+                continue
+        except ImportError as e:
+            print(f"Skipping {name}: {e}")
+            continue
+
+        if args.save and source == "trained":
+            os.makedirs(args.models_dir, exist_ok=True)
+            with open(path, "wb") as f:
+                pickle.dump(model, f)
+
+        print(f"Measuring {name}...", flush=True)
+        size_mb, load_ms, candidate = artifact_cost(name, model, bundle)
+
+        row = {"model": name, "source": source}
+        row.update(
+            quality(candidate, X_test, y_test) if y_test is not None
+            else dict.fromkeys(QUALITY_COLUMNS, np.nan)
+        )
+        row.update({
+            "single_ms": single_row_ms(candidate, X_test, args.single_repeats),
+            "batch_rows_s": batch_rows_per_s(candidate, X_test, args.batch_size),
+            "shap_ms": shap_ms(candidate, X_test, args.shap_rows),
+            "size_mb": size_mb,
+            "load_ms": load_ms,
+        })
+        rows.append(row)
+
+    if not rows:
+        print("No candidate could be measured.")
+        return None
+
+    report = pd.DataFrame(rows)
+
+    objectives = dict(COST_COLUMNS)
+    if y_test is not None:
+        objectives = {args.metric: True, **objectives}
+    report["pareto"] = pareto_front(report, objectives)
+
+    print()
+    print(f"{len(X_test)} evaluation rows "
+          f"({'held-out split of ' + args.data if args.data else 'synthetic, no labels'}), "
+          f"{len(bundle.features)} features")
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.3f}"))
+
+    if args.csv:
+        report.to_csv(args.csv, index=False)
+
+    return report
+
+
+if __name__ == "__main__":
+    main()
@@ -1,45 +1,85 @@
 import numpy as np
 import pandas as pd
-import pickle
-import shap
 import os
-import uuid
-from datetime import datetime
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from model_registry import ModelRegistry
+from feature_pipeline import build_features, check_features
 
-# =========================
-# LOAD ASSETS
-# =========================
-
-with open("modelo8.pkl", "rb") as f:
-    modelo8 = pickle.load(f)
-
-with open("encoders.pkl", "rb") as f:
-    label_encoders = pickle.load(f)
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 
-with open("features.pkl", "rb") as f:
-    FEATURES = pickle.load(f)
+# Los bundles nuevos que se dejen aquí se cargan en caliente (ver model_registry)
+MODELS_DIR = os.environ.get("PREMED_MODELS_DIR", os.path.join(BASE_DIR, "models"))
 
 # =========================
-# SHAP EXPLAINER (global)
+# INPUT PREPARATION
 # =========================
 
-explainer = shap.TreeExplainer(modelo8)
+# Métodos de explicación disponibles:
+#   exact     -> TreeSHAP sobre todos los árboles
+#   saabas    -> atribución por camino (tree_attribution), ~8x más rápida
+#   truncated -> TreeSHAP sobre los primeros `tree_limit` árboles
+EXPLANATION_METHODS = ("exact", "saabas", "truncated")
 
-# =========================
-# INPUT PREPARATION
-# =========================
+DEFAULT_TREE_LIMIT = 200
 
-def explain_prediction(X: pd.DataFrame) -> pd.DataFrame:
-    shap_values = explainer.shap_values(X)
+def method_label(method, tree_limit=None) -> str:
+    """Nombre del método en los márgenes medidos: "saabas", "truncated(200)"."""
+    if method == "truncated":
+        return f"truncated({tree_limit or DEFAULT_TREE_LIMIT})"
+    return method
+
+def approx_margin(bundle, method, tree_limit=None, margin=None) -> float:
+    """
+    Margen de fallback para `method` con el modelo de `bundle`: el indicado
+    o el error medido para ese modelo (ModelBundle.explanation_margins).
+    """
+    if margin is not None:
+        return margin
+
+    label = method_label(method, tree_limit)
+    if label not in bundle.explanation_margins:
+        raise ValueError(
+            f"No measured fallback margin for {label} with model {bundle.version}: "
+            "pass fallback_margin or measure it with explanation_report.py --write."
+        )
+    return bundle.explanation_margins[label]
+
+def shap_matrix(X: pd.DataFrame, bundle, method="exact", tree_limit=None) -> np.ndarray:
+    """Impactos (log-odds) de cada feature para cada fila de X: (n_filas, n_features)."""
+    if method not in EXPLANATION_METHODS:
+        raise ValueError(f"Unknown explanation method '{method}'. Use one of {EXPLANATION_METHODS}.")
+
+    if method == "saabas" and bundle.path_explainer is None:
+        raise ValueError("Saabas explanations are not available for this model (LightGBM without categorical splits only).")
+
+    booster = getattr(bundle.model, "booster_", None)
+    num_trees = (tree_limit or DEFAULT_TREE_LIMIT) if method == "truncated" else None
+
+    if method == "saabas":
+        shap_values, _ = bundle.path_explainer.attributions(X.to_numpy(dtype=float))
+    elif booster is not None:
+        # TreeSHAP de LightGBM: mismos valores que shap.TreeExplainer, pero
+        # sin pasar por Python y soltando el GIL mientras calcula
+        contributions = booster.predict(
+            X.to_numpy(dtype=float), pred_contrib=True, num_iteration=num_trees
+        )
+        shap_values = contributions[:, :-1]
+    else:
+        shap_values = bundle.explainer.shap_values(
+            X, tree_limit=num_trees, check_additivity=num_trees is None
+        )
 
     # Caso binario
     if isinstance(shap_values, list):
-        impacts = shap_values[1][0]
-    else:
-        impacts = shap_values[0]
+        return shap_values[1]
+    return shap_values
 
+def shap_frame(features, impacts) -> pd.DataFrame:
     shap_df = pd.DataFrame({
-        "feature": X.columns,
+        "feature": features,
         "impact": impacts
     })
 
@@ -48,6 +88,12 @@ def explain_prediction(X: pd.DataFrame) -> pd.DataFrame:
 
     return shap_df
 
+def explain_prediction(X: pd.DataFrame, bundle=None, method="exact", tree_limit=None) -> pd.DataFrame:
+    bundle = bundle or registry.current()
+    impacts = shap_matrix(X, bundle, method, tree_limit)[0]
+
+    return shap_frame(X.columns, impacts)
+
 FEATURE_TO_DRIVER = {
     # Glucosa
     "glucose_fasting": "Blood sugar",
@@ -100,77 +146,78 @@ def aggregate_shap_by_driver(shap_df):
 
     return driver_df
 
-def prepare_input(user: dict) -> pd.DataFrame:
+def drivers_too_close(driver_df, margin, top_n=5) -> bool:
     """
-    user: dict con inputs del usuario (valores naturales)
-    devuelve: DataFrame con FEATURES listas para el modelo
+    True si un error de hasta `margin` en cada impacto podría cambiar lo que
+    ve el usuario: qué drivers entran en el top, su orden o su dirección.
     """
+    impacts = driver_df["impact"].abs().to_numpy()[:top_n + 1]
+    gaps = impacts[:-1] - impacts[1:]
 
-    pl = pd.DataFrame([user])
-
-    # =========================
-    # 1. Encoding categóricas
-    # =========================
-    
-    for col, le in label_encoders.items():
-        pl[col] = pl[col].astype(str)
-
-        if "Unknown" not in le.classes_:
-            le.classes_ = np.append(le.classes_, "Unknown")
-
-        pl[col] = pl[col].apply(lambda x: x if x in le.classes_ else "Unknown")
-        pl[col + "_encoded"] = le.transform(pl[col])
+    # Dos impactos pueden equivocarse en sentidos opuestos: hueco < 2 * margen.
+    # Un impacto mostrado por debajo del margen puede cambiar de signo.
+    return bool((gaps < 2 * margin).any() or (impacts[:top_n] < margin).any())
 
-    # =========================
-    # 2. Feature engineering
-    # =========================
-
-    pl["age_group"] = pd.cut(
-        pl["age"],
-        bins=[0, 35, 50, 65, 100],
-        labels=[1, 2, 3, 4]
-    ).astype(int)
-
-    pl["poor_diet"] = (pl["diet_score"] <= 4).astype(int)
-    pl["healthy_diet"] = pl['diet_score'].apply(lambda x: 1 if x>6 else 0)
-
-    pl["non_optimal_sleep"] = (
-        (pl["sleep_hours_per_day"] < 6) |
-        (pl["sleep_hours_per_day"] > 8)
-    ).astype(int)
+def driver_membership(features):
+    """
+    (drivers, matriz (n_features, n_drivers)) con un 1 donde la feature
+    pertenece al driver: impactos @ matriz = impactos por driver.
+    """
+    drivers = sorted({FEATURE_TO_DRIVER[f] for f in features if f in FEATURE_TO_DRIVER})
+    membership = np.array([
+        [FEATURE_TO_DRIVER.get(f) == d for d in drivers]
+        for f in features
+    ], dtype=float)
+    return drivers, membership
+
+def aggregate_shap_by_driver_batch(features, impacts) -> list:
+    """
+    aggregate_shap_by_driver para una matriz de impactos (n_filas, n_features):
+    la suma por driver se hace de una vez con un producto de matrices.
+    """
+    drivers, membership = driver_membership(features)
+    driver_impacts = np.asarray(impacts) @ membership
 
-    pl["overweight_or_obese"] = (pl["bmi"] >= 25).astype(int)
+    return [
+        pd.DataFrame({"driver": drivers, "impact": row})
+        .sort_values(by="impact", key=abs, ascending=False)
+        for row in driver_impacts
+    ]
 
-    pl["high_screen_and_sedentary"] = (
-        (pl["screen_time_hours_per_day"] > 6) &
-        (pl["physical_activity_minutes_per_week"] < 150)
-    ).astype(int)
+def prepare_input(user: dict, bundle=None) -> pd.DataFrame:
+    """
+    user: dict con inputs del usuario (valores naturales)
+    bundle: ModelBundle a usar (por defecto, el activo en el registro)
+    devuelve: DataFrame con FEATURES listas para el modelo
+    """
+    bundle = bundle or registry.current()
 
-    
-    pl["glucose_group"] = pd.cut(
-        pl["glucose_fasting"],
-        bins=[0, 100, 126, 300],
-        labels=[0, 1, 2]
-    ).astype(int)
+    pl = build_features(columns_from_inputs([user]), bundle.encodings)
 
-    # =========================
-    # 3. Interacciones
-    # =========================
+    return select_features(pl, bundle)
 
-    pl["age_group*family_history_diabetes"] = (
-        pl["age_group"] * pl["family_history_diabetes"]
-    )
+def columns_from_inputs(users: list) -> dict:
+    """Lista de dicts de inputs -> dict columna -> np.ndarray."""
+    keys = dict.fromkeys(col for u in users for col in u)
+    columns = {col: np.asarray([u.get(col) for u in users]) for col in keys}
+    columns.setdefault("glucose_fasting", np.full(len(users), np.nan))
+    return columns
 
-    pl["overweight_or_obese*non_optimal_sleep"] = (
-        pl["overweight_or_obese"] * pl["non_optimal_sleep"]
-    )
+def select_features(pl: dict, bundle, rows=None) -> pd.DataFrame:
+    """
+    DataFrame con las features de `bundle` (filas `rows`, o todas) sacado
+    de las columnas ya construidas por build_features.
+    """
+    n_rows = len(next(iter(pl.values())))
+    rows = np.arange(n_rows) if rows is None else rows
 
     # =========================
     # 4. Selección final
     # =========================
-    X = pl.reindex(columns=FEATURES)
+    # Una feature que falte es un error, no una columna de NaN
+    check_features(pl, bundle.features)
 
-    return X
+    return pd.DataFrame({f: pl[f][rows] for f in bundle.features})
 
 # =========================
 # PREDICTION + INTERPRETATION
@@ -194,6 +241,14 @@ def driver_to_user_message(driver, impact):
     template = MESSAGES.get(driver, f"{driver} is {{}} your diabetes risk.")
     return template.format(direction)
 
+def driver_message_lookup():
+    """Mensaje mostrado al usuario -> (driver, dirección), para releer logs."""
+    lookup = {}
+    for driver in set(FEATURE_TO_DRIVER.values()):
+        lookup[driver_to_user_message(driver, 1)] = (driver, "increase")
+        lookup[driver_to_user_message(driver, -1)] = (driver, "reduce")
+    return lookup
+
 ACTIONABLE_RECOMMENDATIONS = {
     "Blood sugar": {
         "increase": [
@@ -316,22 +371,64 @@ def generate_actionable_recommendations(driver_df, top_n=5):
 
     return recommendations
 
-def predict_risk_with_explanation_and_action(user_input: dict) -> dict:
-    X = prepare_input(user_input)
-
-    prob = modelo8.predict_proba(X)[0, 1]
-
+def risk_level(prob):
     if prob < 0.30:
-        level = "Low"
+        return "Low"
     elif prob < 0.60:
-        level = "Medium"
-    else:
-        level = "High"
+        return "Medium"
+    return "High"
 
-    shap_df = explain_prediction(X)
-    driver_df = aggregate_shap_by_driver(shap_df)
-    
+def has_glucose(value) -> bool:
+    return value is not None and not pd.isna(value)
 
+def route_model(user_input: dict, bundle=None):
+    """
+    Bundle que debe puntuar a este usuario: el modelo con glucosa si la ha
+    indicado, si no el modelo sin glucosa.
+    """
+    bundle = bundle or registry.current()
+
+    # Ya es el modelo sin glucosa, o el usuario ha dado su glucosa
+    if "glucose_fasting" not in bundle.features or has_glucose(user_input.get("glucose_fasting")):
+        return bundle
+
+    if bundle.glucose_free is None:
+        raise ValueError(
+            "Fasting glucose is required: no glucose-free model is loaded."
+        )
+    return bundle.glucose_free
+
+def predict_probability(user_input: dict, bundle=None) -> float:
+    """
+    Camino rápido: solo la probabilidad, sin SHAP ni recomendaciones.
+
+    Llama directamente al booster de LightGBM con un array (ver
+    model_probabilities), sin la validación de predict_proba, que cuesta
+    más que el propio modelo.
+    """
+    bundle = route_model(user_input, bundle)
+    X = prepare_input(user_input, bundle)
+
+    return float(model_probabilities(X, bundle)[0])
+
+def model_probabilities(X: pd.DataFrame, bundle) -> np.ndarray:
+    """Probabilidad de diabetes para cada fila de X."""
+    booster = getattr(bundle.model, "booster_", None)
+    if booster is None:
+        return bundle.model.predict_proba(X)[:, 1]
+
+    # Misma probabilidad que predict_proba; la llamada a LightGBM suelta el GIL
+    return booster.predict(X.to_numpy(dtype=float))
+
+def risk_summary(prob, bundle) -> dict:
+    """Lo que se puede enseñar sin explicación: probabilidad y nivel de riesgo."""
+    return {
+        "risk_level": risk_level(prob),
+        "risk_probability": round(float(prob), 3),
+        "model_version": bundle.version
+    }
+
+def build_result(prob, driver_df, bundle, explanation) -> dict:
     explanations = [
         driver_to_user_message(row["driver"], row["impact"])
         for _, row in driver_df.head(5).iterrows()
@@ -340,10 +437,291 @@ def predict_risk_with_explanation_and_action(user_input: dict) -> dict:
     actions = generate_actionable_recommendations(driver_df)
 
     return {
-        "risk_level": level,
+        "risk_level": risk_level(prob),
         "risk_probability": round(float(prob), 3),
         "key_drivers": explanations,
-        "action_plan": actions
+        "action_plan": actions,
+        "model_version": bundle.version,
+        "explanation_method": explanation
     }
 
+def predict_risk_with_explanation_and_action(user_input: dict, bundle=None, explanation="exact",
+                                             tree_limit=None, fallback_margin=None) -> dict:
+    """
+    explanation: "exact", "saabas" o "truncated" (ver explain_prediction).
+    Con un método aproximado se vuelve a SHAP exacto cuando los drivers
+    principales están demasiado cerca para fiarse (drivers_too_close).
+
+    Sin glucose_fasting se usa el modelo sin glucosa (route_model).
+    """
+    # Se lee el bundle activo una vez: un cambio en caliente no debe mezclar versiones
+    bundle = route_model(user_input, bundle or registry.current())
+
+    X = prepare_input(user_input, bundle)
+
+    prob = model_probabilities(X, bundle)[0]
+
+    return explain_result(X, prob, bundle, explanation, tree_limit, fallback_margin)
+
+def explain_result(X: pd.DataFrame, prob, bundle, explanation="exact",
+                   tree_limit=None, fallback_margin=None) -> dict:
+    """Segunda parte de la predicción: SHAP, drivers y plan de acción para una fila ya puntuada."""
+    # Agregación con numpy, como el lote: con pandas costaba más que el
+    # propio cálculo aproximado
+    impacts = shap_matrix(X, bundle, explanation, tree_limit)
+    driver_df = aggregate_shap_by_driver_batch(X.columns, impacts)[0]
+
+    if explanation != "exact" and drivers_too_close(
+        driver_df, approx_margin(bundle, explanation, tree_limit, fallback_margin)
+    ):
+        explanation = "exact"
+        driver_df = aggregate_shap_by_driver_batch(X.columns, shap_matrix(X, bundle))[0]
+
+    return build_result(prob, driver_df, bundle, explanation)
+
+def predict_risk_batch(user_inputs: list, bundle=None, explanation="exact",
+                       tree_limit=None, fallback_margin=None) -> list:
+    """
+    Igual que predict_risk_with_explanation_and_action para muchos usuarios.
+
+    Las features se construyen una sola vez para todo el lote; después las
+    filas con glucosa y sin ella se puntúan y explican juntas, cada grupo
+    con su modelo. Devuelve los resultados en el orden de entrada.
+    """
+    if not user_inputs:
+        return []
+
+    bundle = bundle or registry.current()
+
+    pl = build_features(columns_from_inputs(user_inputs), bundle.encodings)
+    with_glucose = ~np.isnan(pl["glucose_fasting"])
+
+    results = [None] * len(user_inputs)
+
+    for mask in (with_glucose, ~with_glucose):
+        rows = np.flatnonzero(mask)
+        if len(rows) == 0:
+            continue
+
+        group_bundle = route_model(user_inputs[rows[0]], bundle)
+        X = select_features(pl, group_bundle, rows)
+
+        probs = model_probabilities(X, group_bundle)
+        impacts = shap_matrix(X, group_bundle, explanation, tree_limit)
+        driver_dfs = aggregate_shap_by_driver_batch(X.columns, impacts)
+        methods = [explanation] * len(rows)
+
+        if explanation != "exact":
+            margin = approx_margin(group_bundle, explanation, tree_limit, fallback_margin)
+            close = [i for i, d in enumerate(driver_dfs) if drivers_too_close(d, margin)]
+            if close:
+                exact = shap_matrix(X.iloc[close], group_bundle)
+                for i, driver_df in zip(close, aggregate_shap_by_driver_batch(X.columns, exact)):
+                    driver_dfs[i] = driver_df
+                    methods[i] = "exact"
+
+        for i, row in enumerate(rows):
+            results[row] = build_result(probs[i], driver_dfs[i], group_bundle, methods[i])
+
+    return results
+
+# =========================
+# CONCURRENT INFERENCE
+# =========================
+# Los bundles no cambian tras cargarse y LightGBM suelta el GIL mientras
+# predice, así que varias peticiones pueden compartir un modelo entre hilos.
+
+INFERENCE_THREADS = int(os.environ.get("PREMED_INFERENCE_THREADS", os.cpu_count() or 4))
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def inference_pool() -> ThreadPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(
+                max_workers=INFERENCE_THREADS, thread_name_prefix="inference"
+            )
+    return _pool
+
+def submit_prediction(user_input: dict, **kwargs) -> Future:
+    """predict_risk_with_explanation_and_action en el pool de inferencia."""
+    return inference_pool().submit(predict_risk_with_explanation_and_action, user_input, **kwargs)
+
+def predict_risk_parallel(user_inputs: list, bundle=None, chunk_size=64, pool=None, **kwargs) -> list:
+    """
+    predict_risk_batch repartido en trozos de `chunk_size` usuarios que se
+    puntúan en paralelo en el pool de inferencia (o en `pool`).
+    """
+    # Una sola versión del modelo para todo el lote
+    bundle = bundle or registry.current()
+    pool = pool or inference_pool()
+
+    futures = [
+        pool.submit(predict_risk_batch, user_inputs[i:i + chunk_size], bundle, **kwargs)
+        for i in range(0, len(user_inputs), chunk_size)
+    ]
+
+    return [result for future in futures for result in future.result()]
+
+# =========================
+# TWO-PHASE SCORING
+# =========================
+# La tarjeta de riesgo solo necesita la probabilidad, que cuesta uno o dos
+# milisegundos; SHAP y el plan de acción se llevan casi toda la petición.
+# Se devuelve lo primero al momento y el resto se calcula en el pool.
+
+def predict_risk_two_phase(user_input: dict, bundle=None, pool=None, **kwargs):
+    """
+    Devuelve (risk, future):
+      risk    risk_summary del usuario, disponible al momento
+      future  se resuelve con el resultado completo, el mismo dict que
+              predict_risk_with_explanation_and_action(user_input, **kwargs)
+
+    Las dos fases usan el mismo bundle y las mismas features.
+    """
+    bundle = route_model(user_input, bundle or registry.current())
+
+    X = prepare_input(user_input, bundle)
+    prob = model_probabilities(X, bundle)[0]
+
+    future = (pool or inference_pool()).submit(explain_result, X, prob, bundle, **kwargs)
+
+    return risk_summary(prob, bundle), future
+
+# =========================
+# LIVE SCORING
+# =========================
+
+class LiveScoringSession:
+    """
+    Estado por usuario del modo en vivo, donde cada cambio de un widget
+    vuelve a puntuar.
+
+    La probabilidad se calcula siempre al momento, por la vía rápida. La
+    explicación completa solo se calcula cuando los inputs llevan
+    `debounce` segundos sin cambiar; hasta entonces se devuelve la anterior
+    marcada como desfasada. Los resultados se guardan por combinación de
+    inputs, así que volver un slider a un valor anterior no cuesta nada.
+
+    Cambiar un solo input no reaprovecha nada más: con TreeSHAP una feature
+    cambiada puede mover la contribución de todas las demás (comparten
+    caminos en los árboles), y construir de nuevo las features es más barato
+    que averiguar qué columnas derivadas toca.
+    """
+
+    def __init__(self, debounce=0.6, max_cached=128):
+        self.debounce = debounce
+        self.max_cached = max_cached
+        self._probabilities = OrderedDict()
+        self._explanations = OrderedDict()
+        self._last_key = None
+        self._last_change = 0.0
+        self._last_explanation = None
+        # Una ejecución abandonada de Streamlit puede seguir viva a la vez
+        # que la nueva, sobre esta misma sesión
+        self._lock = threading.Lock()
+
+    def _key(self, user_input, bundle):
+        return (bundle.version,) + tuple(sorted(user_input.items()))
+
+    def _remember(self, cache, key, value):
+        with self._lock:
+            cache[key] = value
+            cache.move_to_end(key)
+            while len(cache) > self.max_cached:
+                cache.popitem(last=False)
+
+    def _lookup(self, cache, key):
+        with self._lock:
+            return cache.get(key)
+
+    def score(self, user_input: dict, bundle=None) -> dict:
+        bundle = route_model(user_input, bundle)
+        key = self._key(user_input, bundle)
+
+        with self._lock:
+            if key != self._last_key:
+                self._last_key = key
+                self._last_change = time.monotonic()
+
+        prob = self._lookup(self._probabilities, key)
+        if prob is None:
+            prob = predict_probability(user_input, bundle)
+            self._remember(self._probabilities, key, prob)
+
+        return risk_summary(prob, bundle)
+
+    def time_to_settle(self) -> float:
+        """Segundos que faltan para dar por asentados los inputs actuales."""
+        return max(0.0, self.debounce - (time.monotonic() - self._last_change))
+
+    def settled(self) -> bool:
+        return self.time_to_settle() == 0.0
+
+    def explain(self, user_input: dict, bundle=None, force=False):
+        """
+        Resultado completo de `user_input` si los inputs ya se han asentado
+        (o con `force`); si no, el último resultado completo, o None. No se
+        calcula nada para inputs que ya no son los últimos puntuados.
+
+        Devuelve (result, stale).
+        """
+        # Misma clave que score, también para el modelo sin glucosa
+        bundle = route_model(user_input, bundle)
+        key = self._key(user_input, bundle)
+
+        result = self._lookup(self._explanations, key)
+        with self._lock:
+            current = key == self._last_key
+
+        if result is None and current and (force or self.settled()):
+            result = predict_risk_with_explanation_and_action(user_input, bundle)
+            self._remember(self._explanations, key, result)
+
+        with self._lock:
+            if result is not None:
+                self._last_explanation = result
+                return result, False
+
+            return self._last_explanation, True
+
+# =========================
+# MODEL REGISTRY
+# =========================
+
+# Perfil de referencia para calentar un bundle antes de publicarlo
+WARMUP_INPUT = {
+    "age": 45,
+    "gender": "Female",
+    "ethnicity": "White",
+    "income_level": "Middle",
+    "education_level": "Graduate",
+    "employment_status": "Employed",
+    "smoking_status": "Never",
+    "family_history_diabetes": 0,
+    "hypertension_history": 0,
+    "cardiovascular_history": 0,
+    "heart_rate": 70,
+    "alcohol_consumption_per_week": 2,
+    "diet_score": 6.0,
+    "sleep_hours_per_day": 7.0,
+    "bmi": 24.0,
+    "screen_time_hours_per_day": 5.0,
+    "physical_activity_minutes_per_week": 150,
+    "ldl_cholesterol": 120.0,
+    "glucose_fasting": 95.0
+}
+
+def warm_bundle(bundle):
+    """Una petición completa para que el primer usuario real no pague el arranque en frío."""
+    predict_risk_with_explanation_and_action(WARMUP_INPUT, bundle)
+
+    if bundle.glucose_free is not None:
+        predict_risk_with_explanation_and_action({**WARMUP_INPUT, "glucose_fasting": None}, bundle)
+
+registry = ModelRegistry(warmup=warm_bundle)
 
+# Bundle inicial: los artefactos junto a este fichero
+registry.load(BASE_DIR)
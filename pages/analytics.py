@@ -0,0 +1,93 @@
+import os
+
+import streamlit as st
+
+from analytics import (
+    DIMENSIONS,
+    RISK_LEVELS,
+    RISK_ROLLUP_FILE,
+    driver_frequency,
+    mean_probability,
+    risk_distribution,
+)
+
+# =========================
+# PAGE CONFIG
+# =========================
+st.set_page_config(
+    page_title="PreMed – Usage analytics",
+    page_icon="📊",
+    layout="wide"
+)
+
+st.markdown("<h1>Usage analytics</h1>", unsafe_allow_html=True)
+st.caption(
+    "Built from pre-aggregated rollups only: load time does not depend on "
+    "the number of logged cases."
+)
+
+if not os.path.exists(RISK_ROLLUP_FILE):
+    st.info("No cases logged yet.")
+    st.stop()
+
+# =========================
+# FILTERS
+# =========================
+
+col1, col2, col3 = st.columns(3)
+
+with col1:
+    dimension = st.selectbox(
+        "Breakdown",
+        DIMENSIONS,
+        format_func=lambda d: "None" if d == "all" else d.replace("_", " ").capitalize()
+    )
+
+with col2:
+    start = st.date_input("From", value=None)
+
+with col3:
+    end = st.date_input("To", value=None)
+
+# =========================
+# RISK DISTRIBUTION
+# =========================
+
+st.header("Risk level distribution")
+
+dist = risk_distribution(dimension, start, end)
+
+if dist.empty:
+    st.info("No cases in the selected period.")
+    st.stop()
+
+share = (
+    dist.pivot(index="segment", columns="risk_level", values="share")
+    .reindex(columns=RISK_LEVELS)
+    .fillna(0)
+)
+st.bar_chart(share)
+st.dataframe(dist, hide_index=True)
+
+# =========================
+# MEAN PROBABILITY
+# =========================
+
+st.header("Mean risk probability by day")
+
+daily = mean_probability(dimension, start, end, by_day=True)
+st.line_chart(daily.pivot(index="date", columns="segment", values="mean_probability"))
+
+# =========================
+# DRIVERS
+# =========================
+
+st.header("How often each driver appears")
+
+risk_level = st.selectbox("Risk level", ["All"] + RISK_LEVELS)
+
+drivers = driver_frequency(
+    dimension, start, end,
+    risk_level=None if risk_level == "All" else risk_level
+)
+st.dataframe(drivers, hide_index=True)
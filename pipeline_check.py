@@ -0,0 +1,216 @@
+"""
+Comprobación de consistencia de feature_pipeline.
+
+Construye cada columna derivada dos veces: con feature_pipeline.transform_frame
+y con el código pandas original del notebook (apply, pd.cut y
+LabelEncoder.transform, como era antes de feature_pipeline). Después
+comprueba, columna a columna, que son idénticas. Los perfiles son
+sintéticos (ver load_test.random_profile), más perfiles justo en cada corte
+y umbral. Con --data se usan en su lugar las filas de ese CSV.
+
+También comprueba que check_features cumple su función:
+  - los inputs del formulario de la app producen todas las features del
+    modelo del bundle
+  - una feature del modelo que el pipeline no produce (central_obesity sin
+    waist_to_hip_ratio, o un nombre desconocido) da error en vez de llegar
+    al modelo como NaN
+
+Sale con código 1 si falla alguna comprobación.
+
+Ejemplos:
+  python pipeline_check.py
+  python pipeline_check.py --data diabetes_dataset.csv
+"""
+
+import argparse
+import os
+import pickle
+import random
+import sys
+
+import numpy as np
+import pandas as pd
+
+from feature_pipeline import check_features, transform_frame
+from load_test import random_profile
+from model_registry import ENCODERS_FILE, FEATURES_FILE, encoding_tables
+
+# Valores justo en cada corte o umbral del feature engineering
+EDGES = {
+    "age": [35, 50, 65],
+    "diet_score": [4, 6],
+    "sleep_hours_per_day": [6, 8],
+    "physical_activity_minutes_per_week": [150],
+    "screen_time_hours_per_day": [4, 6, 7],
+    "bmi": [25, 30],
+    "waist_to_hip_ratio": [0.85],
+    "glucose_fasting": [100, 126],
+}
+
+
+def notebook_features(df, label_encoders):
+    """Las columnas derivadas como las construía el notebook, fila a fila."""
+    X = df.copy()
+
+    for col, le in label_encoders.items():
+        values = X[col].astype(str)
+        values = values.where(values.isin(le.classes_), "Unknown")
+        X[col + "_encoded"] = le.transform(values)
+
+    # Diet score
+    X['poor_diet'] = X['diet_score'].apply(lambda x: 1 if x<=4 else 0)
+    X['medium_diet'] = X['diet_score'].apply(lambda x: 1 if x>4 and x<=6 else 0)
+    X['healthy_diet'] = X['diet_score'].apply(lambda x: 1 if x>6 else 0)
+
+    # Sleep
+    X['non_optimal_sleep'] = (
+        (X['sleep_hours_per_day'] < 6) |
+        (X['sleep_hours_per_day'] > 8)
+    ).astype(int)
+
+    # Physical activity
+    X['meets_pa_guidelines'] = (X['physical_activity_minutes_per_week'] >= 150).astype(int)
+    X['sedentary'] = (X['physical_activity_minutes_per_week'] < 150).astype(int)
+
+    # Screen time
+    X['screen_time_category'] = pd.cut(
+        X['screen_time_hours_per_day'],
+        bins=[0, 4, 7, 24],
+        labels=[1, 2, 3]
+    ).astype(int)
+
+    # Age groups
+    X['age_group'] = pd.cut(
+        X['age'],
+        bins=[0, 35, 50, 65, 100],
+        labels=[1, 2, 3, 4]
+    ).astype(int)
+
+    # BMI
+    X['obesity'] = (X['bmi'] >= 30).astype(int)
+    X['overweight_or_obese'] = (X['bmi'] >= 25).astype(int)
+
+    # Obesidad central (solo si hay cintura/cadera, como feature_pipeline)
+    if 'waist_to_hip_ratio' in X:
+        X['central_obesity'] = (X['waist_to_hip_ratio'] > 0.85).astype(int)
+
+    # Sendentarismo Digital
+    X['high_screen_and_sedentary'] = (
+        (X['screen_time_hours_per_day'] > 6) &
+        (X['physical_activity_minutes_per_week'] < 150)
+    ).astype(int)
+
+    # Glucose gasting groups
+    X['glucose_group'] = pd.cut(
+        X['glucose_fasting'],
+        bins=[0, 100, 126, 300],
+        labels=[0, 1, 2]
+    ).astype(int)
+
+    X['age_group*family_history_diabetes'] = X['age_group'] * X['family_history_diabetes']
+    X['overweight_or_obese*non_optimal_sleep'] = X['overweight_or_obese'] * X['non_optimal_sleep']
+
+    return X
+
+
+def synthetic_profiles(samples, seed):
+    rng = random.Random(seed)
+
+    profiles = []
+    for _ in range(samples):
+        profile = random_profile(rng)
+        profile["waist_to_hip_ratio"] = round(rng.uniform(0.7, 1.1), 2)
+        profiles.append(profile)
+
+    # Un perfil por cada valor de corte, con el resto aleatorio
+    for col, values in EDGES.items():
+        for value in values:
+            profiles.append({**profiles[rng.randrange(samples)], col: value})
+
+    return pd.DataFrame(profiles)
+
+
+def notebook_domain(df) -> pd.Series:
+    """
+    Filas que el código del notebook sabe tratar: sus pd.cut dejan fuera los
+    valores fuera de los intervalos (p. ej. 0 horas de pantalla) y fallan.
+    """
+    return (
+        df["age"].between(0, 100, inclusive="right")
+        & df["screen_time_hours_per_day"].between(0, 24, inclusive="right")
+        & df["glucose_fasting"].between(0, 300, inclusive="right")
+    )
+
+
+def compare_columns(df, label_encoders, encodings):
+    """columna derivada -> filas distintas entre el notebook y transform_frame."""
+    expected = notebook_features(df, label_encoders)
+    actual = transform_frame(df, encodings)
+
+    derived = [col for col in expected.columns if col not in df.columns]
+    return {
+        col: int((expected[col].to_numpy(dtype=float) != actual[col].to_numpy(dtype=float)).sum())
+        for col in derived
+    }
+
+
+def raises(func):
+    try:
+        func()
+    except ValueError:
+        return True
+    return False
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--bundle", default=os.path.dirname(os.path.abspath(__file__)),
+                        help="bundle directory with encoders.pkl and features.pkl")
+    parser.add_argument("--data", help="raw dataset CSV (diabetes_dataset.csv)")
+    parser.add_argument("--samples", type=int, default=3000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    with open(os.path.join(args.bundle, ENCODERS_FILE), "rb") as f:
+        label_encoders = pickle.load(f)
+    with open(os.path.join(args.bundle, FEATURES_FILE), "rb") as f:
+        features = tuple(pickle.load(f))
+    encodings = encoding_tables(label_encoders)
+
+    df = pd.read_csv(args.data) if args.data else synthetic_profiles(args.samples, args.seed)
+
+    in_domain = notebook_domain(df)
+    mismatches = compare_columns(df[in_domain], label_encoders, encodings)
+    for col, n in mismatches.items():
+        print(f"{col:<40} {'OK' if n == 0 else f'FAILED ({n} rows differ)'}")
+    print(f"{len(mismatches)} derived columns on {int(in_domain.sum())} rows "
+          f"({int((~in_domain).sum())} outside the notebook's bins skipped)")
+
+    # El formulario de la app no pide waist_to_hip_ratio
+    form = df.drop(columns=["waist_to_hip_ratio"], errors="ignore")
+
+    checks = {
+        "form inputs produce every model feature": not raises(
+            lambda: transform_frame(form, encodings, features)
+        ),
+        "central_obesity without waist_to_hip_ratio raises": raises(
+            lambda: transform_frame(form, encodings, features + ("central_obesity",))
+        ),
+        "unknown feature raises": raises(
+            lambda: check_features({f: None for f in features}, features + ("not_a_feature",))
+        ),
+    }
+    for name, ok in checks.items():
+        print(f"{name:<55} {'OK' if ok else 'FAILED'}")
+
+    if any(mismatches.values()) or not all(checks.values()):
+        print("FAILED: feature_pipeline does not match the notebook's features.")
+        sys.exit(1)
+
+    print("OK: feature_pipeline matches the notebook's features.")
+
+
+if __name__ == "__main__":
+    main()
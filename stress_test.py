@@ -0,0 +1,266 @@
+"""
+Prueba de estrés de concurrencia para model_utils.
+
+Puntúa los mismos perfiles en secuencia (la referencia) y después desde un
+pool de hilos cada vez mayor, y comprueba que cada resultado concurrente es
+idéntico a su resultado secuencial. También informa de cómo escala el
+throughput con el número de hilos para:
+
+  single   una llamada a predict_risk_with_explanation_and_action por
+           perfil, como la hacen las sesiones de Streamlit desde sus hilos
+  batch    predict_risk_parallel: bloques de perfiles por
+           predict_risk_batch, en paralelo
+
+Opcionalmente (--swap) se alternan en caliente dos versiones del modelo
+mientras dura la prueba: el bundle activo y otro con un modelo distinto,
+--swap-with o, por defecto, un LightGBM pequeño entrenado para imitar al
+modelo activo (mismos encoders y features, probabilidades y drivers
+distintos). La referencia secuencial se calcula con cada versión, y cada
+resultado concurrente debe coincidir con la referencia de la versión que
+indica en model_version: así se detecta una petición puntuada con un
+modelo y etiquetada con el otro.
+
+Sale con código 1 si algún resultado concurrente es distinto.
+
+Ejemplos:
+  python stress_test.py --profiles 400 --threads 1,2,4,8 --swap
+  python stress_test.py --swap --swap-with models/2026-03-01
+"""
+
+import argparse
+import os
+import pickle
+import random
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import model_utils
+from feature_pipeline import transform_frame
+from load_test import random_profile
+from model_registry import (
+    ENCODERS_FILE,
+    FEATURES_FILE,
+    GLUCOSE_FREE_MODEL_FILE,
+    MODEL_FILE,
+    load_bundle,
+)
+from model_utils import (
+    columns_from_inputs,
+    model_probabilities,
+    predict_risk_parallel,
+    predict_risk_with_explanation_and_action,
+    registry,
+)
+
+
+def make_profiles(n, seed):
+    rng = random.Random(seed)
+    glucose_optional = registry.current().glucose_free is not None
+    profiles = []
+
+    for i in range(n):
+        profile = random_profile(rng)
+        for key in ("weight", "height_cm"):
+            profile.pop(key)
+
+        # Con modelo sin glucosa, mezclar ambos tipos de petición
+        if glucose_optional and i % 3 == 0:
+            profile["glucose_fasting"] = None
+
+        profiles.append(profile)
+
+    return profiles
+
+
+def run_single(profiles, threads):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        results = list(pool.map(predict_risk_with_explanation_and_action, profiles))
+    return results, time.perf_counter() - start
+
+
+def run_batch(profiles, threads, chunk_size):
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        start = time.perf_counter()
+        results = predict_risk_parallel(profiles, chunk_size=chunk_size, pool=pool)
+    return results, time.perf_counter() - start
+
+
+def imitation_model(bundle, X):
+    """LightGBM pequeño entrenado con las predicciones de `bundle` sobre X."""
+    from lightgbm import LGBMClassifier
+
+    probs = model_probabilities(X, bundle)
+    y = (probs >= np.median(probs)).astype(int)
+
+    return LGBMClassifier(n_estimators=50, random_state=0, verbose=-1).fit(X, y)
+
+
+def write_alternate_bundle(bundle, directory, seed):
+    """
+    Escribe en `directory` un bundle con los encoders y features de `bundle`
+    y otros modelos (también el sin glucosa, si lo hay).
+    """
+    rng = random.Random(seed)
+    df = pd.DataFrame(columns_from_inputs([random_profile(rng) for _ in range(2000)]))
+    X = transform_frame(df, bundle.encodings)
+
+    models = {MODEL_FILE: bundle}
+    if bundle.glucose_free is not None:
+        models[GLUCOSE_FREE_MODEL_FILE] = bundle.glucose_free
+
+    for name, b in models.items():
+        with open(os.path.join(directory, name), "wb") as f:
+            pickle.dump(imitation_model(b, X[list(b.features)]), f)
+
+    for name in (ENCODERS_FILE, FEATURES_FILE):
+        shutil.copy(os.path.join(bundle.path, name), directory)
+
+
+def keep_swapping(stop, versions):
+    """Alterna los bundles (path, versión) una y otra vez mientras dura la prueba."""
+    while not stop.is_set():
+        for path, version in versions:
+            registry.load(path, version=version)
+
+
+def sequential_references(profiles, bundles):
+    """
+    model_version -> resultados secuenciales de cada perfil con ese bundle
+    (el sin glucosa tiene su propia versión, con la misma lista).
+    """
+    references = {}
+    for bundle in bundles:
+        results = [predict_risk_with_explanation_and_action(p, bundle) for p in profiles]
+        for r in results:
+            references.setdefault(r["model_version"], results)
+    return references
+
+
+def count_mismatches(results, references):
+    """Resultados distintos del de referencia de la versión que dicen tener."""
+    return sum(
+        r["model_version"] not in references or r != references[r["model_version"]][i]
+        for i, r in enumerate(results)
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--profiles", type=int, default=400)
+    parser.add_argument("--threads", default="1,2,4,8")
+    parser.add_argument("--chunk-size", type=int, default=32)
+    parser.add_argument("--swap", action="store_true",
+                        help="hot-swap two model versions continuously during the test")
+    parser.add_argument("--swap-with",
+                        help="bundle directory to alternate with the active one "
+                             "(default: a generated imitation model)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    thread_counts = [int(t) for t in args.threads.split(",") if t.strip()]
+    profiles = make_profiles(args.profiles, args.seed)
+
+    bundle = registry.current()
+    bundles = [bundle]
+    tmp = None
+
+    if args.swap:
+        if args.swap_with:
+            other_path, other_version = os.path.abspath(args.swap_with), None
+        else:
+            tmp = tempfile.TemporaryDirectory()
+            write_alternate_bundle(bundle, tmp.name, args.seed)
+            other_path, other_version = tmp.name, f"{bundle.version}-swap"
+
+        other = load_bundle(other_path, other_version)
+        if other.version == bundle.version:
+            parser.error(f"--swap-with has the same version as the active bundle ({bundle.version}).")
+        bundles.append(other)
+
+    references = sequential_references(profiles, bundles)
+
+    if args.swap:
+        differing = sum(
+            a["risk_probability"] != b["risk_probability"] or a["key_drivers"] != b["key_drivers"]
+            for a, b in zip(references[bundle.version], references[other.version])
+        )
+        print(f"Swapping {bundle.version} <-> {other.version}: "
+              f"{differing}/{len(profiles)} profiles score differently", flush=True)
+        if not differing:
+            parser.error("The two versions give the same results: the swap test would prove nothing.")
+
+    stop = threading.Event()
+    swapper = None
+    if args.swap:
+        swapper = threading.Thread(
+            target=keep_swapping,
+            args=(stop, [(other.path, other.version), (bundle.path, bundle.version)]),
+            daemon=True
+        )
+        swapper.start()
+
+    rows = []
+    try:
+        for mode in ("single", "batch"):
+            baseline = None
+
+            for threads in thread_counts:
+                if mode == "single":
+                    results, elapsed = run_single(profiles, threads)
+                else:
+                    results, elapsed = run_batch(profiles, threads, args.chunk_size)
+
+                throughput = len(profiles) / elapsed
+                baseline = baseline or throughput
+                mismatches = count_mismatches(results, references)
+                versions = len({r["model_version"] for r in results})
+
+                rows.append({
+                    "mode": mode,
+                    "threads": threads,
+                    "profiles_per_s": throughput,
+                    "speedup": throughput / baseline,
+                    "versions": versions,
+                    "mismatches": mismatches,
+                })
+                print(
+                    f"{mode:>6} x{threads:<3} {throughput:8.1f} profiles/s  "
+                    f"speedup {throughput / baseline:4.2f}  versions {versions}  "
+                    f"mismatches {mismatches}",
+                    flush=True
+                )
+    finally:
+        stop.set()
+        if swapper is not None:
+            swapper.join()
+            registry.load(bundle.path, version=bundle.version)
+        if tmp is not None:
+            tmp.cleanup()
+
+    report = pd.DataFrame(rows)
+    print()
+    print(report.to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print(f"\nmodel {registry.current().version}, "
+          f"inference pool size {model_utils.INFERENCE_THREADS}")
+
+    if report["mismatches"].sum():
+        print("FAILED: concurrent results differ from the sequential reference "
+              "of their model version.")
+        sys.exit(1)
+
+    print("OK: all concurrent results match the sequential reference of their model version.")
+    return report
+
+
+if __name__ == "__main__":
+    main()